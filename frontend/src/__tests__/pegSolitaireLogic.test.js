@@ -15,9 +15,51 @@ import {
   isGameOver,
   encodeBoard,
   detectBoardType,
-  solvePuzzle
+  solvePuzzle,
+  TRACE_NO_MOVE,
+  decodeTrace,
+  decodeTraceMove,
+  replayTrace
 } from '../utils/pegSolitaireLogic';
 
+// Build a trace file the way searchtrace.py writes one
+const buildTrace = (boardType, events) => {
+  const bytes = [];
+  const u32 = (v) => bytes.push(v & 0xff, (v >>> 8) & 0xff, (v >>> 16) & 0xff, (v >>> 24) & 0xff);
+  let low = 0;
+  let high = 0;
+  BOARDS[boardType].layout.forEach((row, r) => row.forEach((cell, c) => {
+    const bit = r * 7 + c;
+    if (cell === 1) {
+      if (bit < 32) low |= 1 << bit;
+      else high |= 1 << (bit - 32);
+    }
+  }));
+  bytes.push(...'PEGT'.split('').map(ch => ch.charCodeAt(0)), 1, boardType === 'british' ? 0 : 1, 0, 0);
+  u32(low);
+  u32(high);
+  u32(events.length);
+  events.forEach(e => bytes.push(e.type));
+  events.forEach(e => bytes.push(e.move));
+  for (const key of ['node', 'parent']) {
+    const column = [];
+    let prev = 0;
+    events.forEach(e => {
+      const d = e[key] - prev;
+      prev = e[key];
+      let z = d >= 0 ? d * 2 : -d * 2 - 1;
+      while (z > 0x7f) {
+        column.push((z & 0x7f) | 0x80);
+        z >>>= 7;
+      }
+      column.push(z);
+    });
+    u32(column.length);
+    bytes.push(...column);
+  }
+  return new Uint8Array(bytes).buffer;
+};
+
 describe('Peg Solitaire Logic', () => {
   describe('BOARDS configuration', () => {
     it('has british board defined', () => {
@@ -439,4 +481,64 @@ describe('Peg Solitaire Logic', () => {
       expect(isGameOver(board)).toBe(true);
     });
   });
+
+  describe('search traces', () => {
+    // (1,3) down into the centre, then (3,1) right into it
+    const down = (1 * 7 + 3) * 4 + 2;
+    const right = (3 * 7 + 1) * 4 + 3;
+    const events = [
+      { type: 0, node: 0, parent: 0, move: TRACE_NO_MOVE },
+      { type: 1, node: 1, parent: 0, move: down },
+      { type: 3, node: 1, parent: 0, move: down },
+      { type: 1, node: 2, parent: 0, move: right },
+      { type: 2, node: 1, parent: 2, move: right },
+      { type: 4, node: 2, parent: 2, move: TRACE_NO_MOVE },
+    ];
+
+    it('decodes the header and start board', () => {
+      const trace = decodeTrace(buildTrace('british', events));
+      expect(trace.boardType).toBe('british');
+      expect(trace.board).toEqual(BOARDS.british.layout);
+      expect(trace.types).toHaveLength(6);
+    });
+
+    it('undoes the delta encoding of nodes and parents', () => {
+      const trace = decodeTrace(buildTrace('british', events));
+      expect(Array.from(trace.nodes)).toEqual([0, 1, 1, 2, 1, 2]);
+      expect(Array.from(trace.parents)).toEqual([0, 0, 0, 0, 2, 2]);
+    });
+
+    it('decodes large deltas', () => {
+      const far = [
+        { type: 0, node: 0, parent: 0, move: TRACE_NO_MOVE },
+        { type: 1, node: 100000, parent: 0, move: down },
+        { type: 3, node: 5, parent: 99999, move: down },
+      ];
+      const trace = decodeTrace(buildTrace('european', far));
+      expect(trace.boardType).toBe('european');
+      expect(Array.from(trace.nodes)).toEqual([0, 100000, 5]);
+      expect(Array.from(trace.parents)).toEqual([0, 0, 99999]);
+    });
+
+    it('rejects other files', () => {
+      expect(() => decodeTrace(new Uint8Array(24).buffer)).toThrow();
+    });
+
+    it('decodes moves into makeMove form', () => {
+      expect(decodeTraceMove(down)).toEqual({
+        startRow: 1, startCol: 3, endRow: 3, endCol: 3, midRow: 2, midCol: 3,
+      });
+      expect(decodeTraceMove(TRACE_NO_MOVE)).toBeNull();
+    });
+
+    it('replays visits and backtracks', () => {
+      const steps = [...replayTrace(decodeTrace(buildTrace('british', events)))];
+      expect(steps.map(s => s.type)).toEqual(['root', 'visit', 'backtrack', 'visit', 'revisit', 'solved']);
+      expect(countPegs(steps[1].board)).toBe(31);
+      expect(steps[1].board[3][3]).toBe(1);
+      expect(steps[2].board).toEqual(BOARDS.british.layout);
+      expect(steps[3].board[3][2]).toBe(0);
+      expect(steps[5].board).toBe(steps[3].board);
+    });
+  });
 });
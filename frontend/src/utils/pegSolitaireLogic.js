@@ -299,3 +299,128 @@ export const solvePuzzle = (startBoard, maxExpansions = 100000) => {
 
   return null;
 };
+
+// Search traces written by references/peg-solitaire/visualise/searchtrace.py
+export const TRACE_EVENTS = ['root', 'visit', 'revisit', 'backtrack', 'solved'];
+export const TRACE_NO_MOVE = 255;
+const TRACE_MAGIC = 'PEGT';
+const TRACE_VERSION = 1;
+const TRACE_HEADER_SIZE = 20;
+const TRACE_DIRECTIONS = [
+  [-2, 0], // w
+  [0, -2], // a
+  [2, 0],  // s
+  [0, 2],  // d
+];
+
+/**
+ * Read a column of zigzag varint deltas
+ * @param {DataView} view - Trace bytes
+ * @param {number} offset - Start of the column's length prefix
+ * @param {number} count - Number of values
+ * @returns {{values: Int32Array, end: number}} Decoded values and the offset after the column
+ */
+const readTraceDeltas = (view, offset, count) => {
+  const length = view.getUint32(offset, true);
+  let pos = offset + 4;
+  const end = pos + length;
+  const values = new Int32Array(count);
+  let prev = 0;
+  let i = 0;
+  while (pos < end && i < count) {
+    let z = 0;
+    let shift = 0;
+    let byte;
+    do {
+      byte = view.getUint8(pos++);
+      z += (byte & 0x7f) * 2 ** shift;
+      shift += 7;
+    } while (byte >= 0x80);
+    prev += z % 2 === 0 ? z / 2 : -(z + 1) / 2;
+    values[i++] = prev;
+  }
+  if (i !== count || pos !== end) {
+    throw new Error('Malformed trace column');
+  }
+  return { values, end };
+};
+
+/**
+ * Decode a search trace file
+ * @param {ArrayBuffer} buffer - Contents of a .ptrace file
+ * @returns {{boardType: string, board: Array<Array<number|null>>, types: Uint8Array, moves: Uint8Array, nodes: Int32Array, parents: Int32Array}} Trace columns
+ */
+export const decodeTrace = (buffer) => {
+  const view = new DataView(buffer);
+  const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+  if (magic !== TRACE_MAGIC || view.getUint8(4) !== TRACE_VERSION) {
+    throw new Error('Not a search trace');
+  }
+  const boardType = view.getUint8(5) === 0 ? 'british' : 'european';
+  const low = view.getUint32(8, true);
+  const high = view.getUint32(12, true);
+  const count = view.getUint32(16, true);
+
+  const board = cloneBoard(BOARDS[boardType].layout);
+  for (let r = 0; r < 7; r++) {
+    for (let c = 0; c < 7; c++) {
+      if (board[r][c] === null) continue;
+      const bit = r * 7 + c;
+      const word = bit < 32 ? low : high;
+      board[r][c] = (word >>> (bit % 32)) & 1;
+    }
+  }
+
+  let offset = TRACE_HEADER_SIZE;
+  const types = new Uint8Array(buffer, offset, count);
+  const moves = new Uint8Array(buffer, offset + count, count);
+  const nodes = readTraceDeltas(view, offset + 2 * count, count);
+  const parents = readTraceDeltas(view, nodes.end, count);
+  return { boardType, board, types, moves, nodes: nodes.values, parents: parents.values };
+};
+
+/**
+ * Decode a trace move byte into the move shape used by makeMove
+ * @param {number} code - (row * 7 + col) * 4 + direction
+ * @returns {{startRow: number, startCol: number, endRow: number, endCol: number, midRow: number, midCol: number}|null} Move, or null for TRACE_NO_MOVE
+ */
+export const decodeTraceMove = (code) => {
+  if (code === TRACE_NO_MOVE) return null;
+  const cell = Math.floor(code / 4);
+  const [dr, dc] = TRACE_DIRECTIONS[code % 4];
+  const startRow = Math.floor(cell / 7);
+  const startCol = cell % 7;
+  return {
+    startRow,
+    startCol,
+    endRow: startRow + dr,
+    endCol: startCol + dc,
+    midRow: startRow + dr / 2,
+    midCol: startCol + dc / 2,
+  };
+};
+
+/**
+ * Replay a decoded trace, yielding the board the search stands on after each event
+ * @param {Object} trace - Result of decodeTrace
+ * @yields {{type: string, node: number, parent: number, move: Object|null, board: Array<Array<number|null>>}} Event with the current board
+ */
+export function* replayTrace(trace) {
+  const boards = new Map();
+  let board = trace.board;
+  for (let i = 0; i < trace.types.length; i++) {
+    const type = TRACE_EVENTS[trace.types[i]];
+    const node = trace.nodes[i];
+    const parent = trace.parents[i];
+    const move = decodeTraceMove(trace.moves[i]);
+    if (type === 'root') {
+      boards.set(node, board);
+    } else if (type === 'visit') {
+      board = makeMove(boards.get(parent), move.startRow, move.startCol, move);
+      boards.set(node, board);
+    } else if (type === 'backtrack') {
+      board = boards.get(parent);
+    }
+    yield { type, node, parent, move, board };
+  }
+}
@@ -0,0 +1,139 @@
+"""
+Anytime solver: best answer within a time or node budget.
+
+Runs beam searches of doubling width (1, 2, 4, ...) ranked by the bestfirst
+heuristics, remembering the position with the fewest pegs seen so far and how
+to reach it. When the budget runs out -- or a beam wide enough to hold every
+position finishes -- that position and its jumps are returned, so boards with
+no single-peg finish (the European board from the centre) still get a useful
+answer quickly.
+
+    python anytime.py european --hole 3,3 --budget 0.2
+"""
+import argparse
+import heapq
+import time
+
+from bitboard import layout, parse_cell, pegs
+from bestfirst import DEFAULT, HEURISTICS
+
+
+class OutOfBudget(Exception):
+    pass
+
+
+class Anytime:
+    def __init__(self, bb, target=None, budget=0.2, max_nodes=None,
+                 heuristics=DEFAULT):
+        self.bb = bb
+        self.target = target
+        self.budget = budget
+        self.max_nodes = max_nodes
+        self.scorers = [(HEURISTICS[name](bb, target), w) for name, w in heuristics]
+        self.syms = bb.fixing(target)
+        self.nodes = 0
+        self.width = 0
+        self.exhausted = False
+
+    def key(self, state):
+        return self.bb.canonical(state, self.syms)
+
+    def penalty(self, state):
+        total = 0
+        for score, w in self.scorers:
+            s = score(state)
+            if s is None:
+                return None
+            total += w * s
+        return total
+
+    def rank(self, state):
+        # fewest pegs first, then positions with a peg on the target
+        on_target = self.target is not None and state >> self.target & 1
+        return (pegs(state), not on_target)
+
+    def consider(self, state, link):
+        r = self.rank(state)
+        if r < self.best_rank:
+            self.best_rank = r
+            self.best = (state, link)
+
+    def tick(self):
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes >= self.max_nodes:
+            raise OutOfBudget
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise OutOfBudget
+
+    def beam(self, start, width):
+        """One beam pass; True if no layer had to be cut down to `width`."""
+        bb = self.bb
+        layer = [(start, None)]
+        complete = True
+        while layer:
+            nxt = {}
+            for state, link in layer:
+                for j in bb.moves(state):
+                    child = state ^ bb.masks[j]
+                    k = self.key(child)
+                    if k in nxt:
+                        continue
+                    self.tick()
+                    self.consider(child, (j, link))
+                    if bb.is_solved(child, self.target):
+                        # recorded as best, which ends solve()'s loop
+                        return False
+                    p = self.penalty(child)
+                    if p is not None:
+                        nxt[k] = (p, child, (j, link))
+            if len(nxt) > width:
+                complete = False
+            layer = [(child, link) for _, child, link
+                     in heapq.nsmallest(width, nxt.values(), key=lambda e: e[0])]
+        return complete
+
+    def solve(self, start):
+        """Return (position, jumps) for the best position found in budget."""
+        self.deadline = None
+        if self.budget is not None:
+            self.deadline = time.perf_counter() + self.budget
+        self.best = (start, None)
+        self.best_rank = self.rank(start)
+        self.width = 1
+        try:
+            while not self.bb.is_solved(self.best[0], self.target):
+                if self.beam(start, self.width):
+                    self.exhausted = True
+                    break
+                self.width *= 2
+        except OutOfBudget:
+            pass
+        state, link = self.best
+        jumps = []
+        while link is not None:
+            j, link = link
+            jumps.append(j)
+        jumps.reverse()
+        return state, jumps
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("board", choices=["british", "european"])
+    parser.add_argument("--hole", default="3,3", help="starting vacancy as row,col")
+    parser.add_argument("--target", help="finishing cell as row,col")
+    parser.add_argument("--budget", type=float, default=0.2, help="seconds")
+    parser.add_argument("--nodes", type=int, help="node budget")
+    args = parser.parse_args()
+
+    bb = layout(args.board)
+    target = parse_cell(args.target) if args.target else None
+    solver = Anytime(bb, target, args.budget, args.nodes)
+    t0 = time.perf_counter()
+    state, jumps = solver.solve(bb.valid ^ (1 << parse_cell(args.hole)))
+    print("%d nodes, beam width %d, %.3fs%s"
+          % (solver.nodes, solver.width, time.perf_counter() - t0,
+             ", exhausted" if solver.exhausted else ""))
+    bb.print_board(state)
+    print([bb.to_move(j) for j in jumps])
+    print(pegs(state), "pegs left")
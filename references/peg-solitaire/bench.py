@@ -0,0 +1,75 @@
+"""
+Benchmark suite for the peg solitaire DFS move-ordering policies.
+
+Runs the sleep-set DFS from por.py once per start hole -- one hole from each
+symmetry class -- for every policy, each capped at --max-nodes, and prints
+the nodes to the first single-peg finish. Capped runs count as --max-nodes,
+so the mean is a lower bound for policies that run out. The policy with the
+lowest mean comes last.
+
+    python bench.py british
+    python bench.py european --max-nodes 100000 --order scan --order history
+"""
+import argparse
+import sys
+import time
+
+from bitboard import coords, layout
+from ordering import POLICIES, policy
+from por import SleepDFS
+
+
+def start_holes(bb):
+    """One start hole from each symmetry class of the board."""
+    holes = []
+    for i in bb.cells:
+        if min(perm[i] for perm in bb.perms) == i:
+            holes.append(i)
+    return holes
+
+
+def run(bb, hole, name, max_nodes, target=None):
+    solver = SleepDFS(bb, target, order=policy(name, bb), max_nodes=max_nodes)
+    t0 = time.perf_counter()
+    jumps = solver.solve(bb.valid ^ (1 << hole))
+    return solver.nodes, jumps is not None, time.perf_counter() - t0
+
+
+def bench(bb, names, max_nodes, holes=None, verbose=True):
+    """{policy: (mean nodes, holes solved, seconds)} over `holes`."""
+    holes = holes or start_holes(bb)
+    results = {}
+    for name in names:
+        total, solved, seconds = 0, 0, 0.0
+        for hole in holes:
+            nodes, ok, t = run(bb, hole, name, max_nodes)
+            total += min(nodes, max_nodes)
+            solved += ok
+            seconds += t
+            if verbose:
+                print("  %-15s %d,%d  %8d%s" % ((name,) + coords(hole)
+                      + (nodes, "" if ok else " (capped)" if nodes > max_nodes else " (none)")))
+        results[name] = (total / len(holes), solved, seconds)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("board", choices=["british", "european"])
+    parser.add_argument("--order", action="append", choices=POLICIES,
+                        help="policy to score (default: all)")
+    parser.add_argument("--max-nodes", type=int, default=200_000)
+    parser.add_argument("-q", "--quiet", action="store_true",
+                        help="summary only, no per-hole lines")
+    args = parser.parse_args()
+
+    sys.setrecursionlimit(10000)
+    bb = layout(args.board)
+    holes = start_holes(bb)
+    results = bench(bb, args.order or list(POLICIES), args.max_nodes, holes,
+                    verbose=not args.quiet)
+    print("%d start holes, cap %d nodes" % (len(holes), args.max_nodes))
+    for name, (mean, solved, seconds) in sorted(results.items(),
+                                                key=lambda kv: -kv[1][0]):
+        print("%-15s mean %10.0f  solved %2d/%d  %6.1fs"
+              % (name, mean, solved, len(holes), seconds))
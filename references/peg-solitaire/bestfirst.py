@@ -0,0 +1,205 @@
+"""
+Best-first (A* / weighted A*) search over packed positions.
+
+Every solution removes the same number of pegs, so the jumps-to-go of a live
+position is just pegs - 1 and that alone gives A* nothing to rank by. The
+estimate here is h = pegs - 1 + penalty, where the penalty is a weighted sum
+of pluggable heuristics that guess how hard the position will be to finish,
+and the open list is ranked by g + weight * h: weight 1 is A*, larger weights
+lean towards deeper positions. Positions a pagoda function proves dead are
+never queued.
+
+When the open list passes max_open it is cut to its better half. The
+positions cut are forgotten entirely, so one generated again later is
+queued again. Memory is then bounded by the open list and the positions
+expanded. The search is no longer complete, though: a None from solve() with
+`dropped` non-zero means it gave up, not that there is no solution.
+
+    python bestfirst.py british --target 3,3
+    python bestfirst.py european --hole 6,4 --heuristic isolation=2 --heuristic distance
+"""
+import argparse
+import heapq
+import time
+
+from bitboard import N, coords, index, layout, parse_cell, pegs, weight_tables, weigh
+
+# golden-ratio resource count: a jump never raises the total, so a position
+# scoring below the finished one can never get there
+SIGMA = (5 ** 0.5 - 1) / 2
+EPS = 1e-9
+
+COL0 = sum(1 << index(r, 0) for r in range(N))
+COL6 = sum(1 << index(r, N-1) for r in range(N))
+
+
+def centre_of(bb, target):
+    if target is not None:
+        return coords(target)
+    return (N // 2, N // 2)
+
+
+def isolation(bb, target):
+    """Pegs with no orthogonal neighbour: each needs help to be removed."""
+    def score(state):
+        near = ((state >> 1) & ~COL6) | ((state << 1) & ~COL0) \
+            | (state >> N) | (state << N)
+        return (state & ~near).bit_count()
+    return score
+
+
+def distance(bb, target):
+    """Mean Manhattan distance of the pegs from the finishing cell."""
+    tr, tc = centre_of(bb, target)
+    tables = weight_tables({i: abs(coords(i)[0] - tr) + abs(coords(i)[1] - tc)
+                            for i in bb.cells})
+
+    def score(state):
+        return weigh(tables, state) / max(pegs(state), 1)
+    return score
+
+
+def pagoda(bb, target):
+    """
+    Slack left in the golden-ratio pagoda towards the target. None marks a
+    position that can no longer finish there; otherwise less slack scores
+    worse. Without a fixed target there is no single pagoda to check.
+    """
+    if target is None:
+        return lambda state: 0
+    tr, tc = coords(target)
+    tables = weight_tables({i: SIGMA ** (abs(coords(i)[0] - tr) + abs(coords(i)[1] - tc))
+                            for i in bb.cells})
+
+    def score(state):
+        slack = weigh(tables, state) - 1
+        if slack < -EPS:
+            return None
+        return -slack
+    return score
+
+
+HEURISTICS = {
+    "isolation": isolation,
+    "distance": distance,
+    "pagoda": pagoda,
+}
+
+
+DEFAULT = (("isolation", 1), ("distance", 1), ("pagoda", 1))
+
+
+def parse_heuristic(text):
+    """"name" or "name=weight" from the command line."""
+    name, _, weight = text.partition("=")
+    if name not in HEURISTICS:
+        raise argparse.ArgumentTypeError("unknown heuristic %r" % name)
+    return name, float(weight or 1)
+
+
+class BestFirst:
+    def __init__(self, bb, target=None, heuristics=DEFAULT, weight=2.0,
+                 max_open=1_000_000):
+        self.bb = bb
+        self.target = target
+        self.weight = weight
+        self.max_open = max_open
+        self.scorers = [(HEURISTICS[name](bb, target), w) for name, w in heuristics]
+        self.syms = bb.fixing(target)
+        self.nodes = 0
+        self.dropped = 0
+
+    def key(self, state):
+        return self.bb.canonical(state, self.syms)
+
+    def penalty(self, state):
+        total = 0
+        for score, w in self.scorers:
+            s = score(state)
+            if s is None:
+                return None
+            total += w * s
+        return total
+
+    def solve(self, start):
+        """Return the list of jump indices from `start` to a finish, or None:
+        there is none or, if self.dropped, the search gave up on it."""
+        bb = self.bb
+        came = {start: None}
+        closed = set()
+        order = 0
+        p = self.penalty(start)
+        if p is None:
+            return None
+        open_list = [(self.weight * (pegs(start) - 1 + p), 0, order, start)]
+
+        while open_list:
+            _, neg_g, _, state = heapq.heappop(open_list)
+            key = self.key(state)
+            if key in closed:
+                continue
+            closed.add(key)
+            self.nodes += 1
+
+            if bb.is_solved(state, self.target):
+                return self.path(came, state)
+
+            g = 1 - neg_g
+            for j in bb.moves(state):
+                child = state ^ bb.masks[j]
+                if child in came or self.key(child) in closed:
+                    continue
+                p = self.penalty(child)
+                if p is None:
+                    continue
+                came[child] = (state, j)
+                order += 1
+                f = g + self.weight * (pegs(child) - 1 + p)
+                heapq.heappush(open_list, (f, -g, order, child))
+
+            if len(open_list) > self.max_open:
+                # a sorted list is a heap; what is cut was never expanded,
+                # so it is nobody's parent in `came`
+                open_list.sort()
+                cut = open_list[self.max_open // 2:]
+                del open_list[self.max_open // 2:]
+                for entry in cut:
+                    del came[entry[3]]
+                self.dropped += len(cut)
+        return None
+
+    def path(self, came, state):
+        jumps = []
+        while came[state] is not None:
+            state, j = came[state]
+            jumps.append(j)
+        jumps.reverse()
+        return jumps
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("board", choices=["british", "european"])
+    parser.add_argument("--hole", default="3,3", help="starting vacancy as row,col")
+    parser.add_argument("--target", help="finishing cell as row,col")
+    parser.add_argument("--heuristic", action="append", type=parse_heuristic,
+                        help="name[=weight], any of: " + ", ".join(HEURISTICS))
+    parser.add_argument("--weight", type=float, default=2.0)
+    parser.add_argument("--max-open", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    bb = layout(args.board)
+    target = parse_cell(args.target) if args.target else None
+    solver = BestFirst(bb, target, args.heuristic or DEFAULT,
+                       args.weight, args.max_open)
+    t0 = time.time()
+    jumps = solver.solve(bb.valid ^ (1 << parse_cell(args.hole)))
+    print("%d nodes expanded, %d dropped, %.2fs"
+          % (solver.nodes, solver.dropped, time.time() - t0))
+    if jumps is None and solver.dropped:
+        print("gave up after dropping %d positions" % solver.dropped)
+    elif jumps is None:
+        print("no solution")
+    else:
+        print([bb.to_move(j) for j in jumps])
+        print(len(jumps))
@@ -0,0 +1,228 @@
+"""
+Packed board model shared by the peg solitaire solvers.
+
+A position is a plain int with bit ``r * N + c`` set when cell (r, c) holds a
+peg -- the same layout enumerate/british-bfs.cpp uses. The list-of-lists
+boards from british/ and european/ (0 = void, -1 = empty, >0 = peg) convert
+to and from this form with ``BitBoard.encode`` / ``BitBoard.decode``.
+"""
+
+N = 7
+
+BRITISH = [[ 0,  0,  1,  2,  3,  0,  0],
+           [ 0,  0,  4,  5,  6,  0,  0],
+           [ 7,  8,  9, 10, 11, 12, 13],
+           [14, 15, 16, -1, 17, 18, 19],
+           [20, 21, 22, 23, 24, 25, 26],
+           [ 0,  0, 27, 28, 29,  0,  0],
+           [ 0,  0, 30, 31, 32,  0,  0]]
+
+EUROPEAN = [[ 0,  0,  1,  2,  3,  0,  0],
+            [ 0,  4,  5,  6,  7,  8,  0],
+            [ 9, 10, 11, 12, 13, 14, 15],
+            [16, 17, 18, -1, 19, 20, 21],
+            [22, 23, 24, 25, 26, 27, 28],
+            [ 0, 29, 30, 31, 32, 33,  0],
+            [ 0,  0, 34, 35, 36,  0,  0]]
+
+LAYOUTS = {"british": BRITISH, "european": EUROPEAN}
+
+# same direction letters as the game loops and move lists use
+DIRECTIONS = {"w": (-1, 0), "a": (0, -1), "s": (1, 0), "d": (0, 1)}
+
+# the eight symmetries of the square, as (r, c) -> (r', c') on a 7x7 grid
+SYMMETRIES = [
+    lambda r, c: (r, c),
+    lambda r, c: (c, N-1-r),
+    lambda r, c: (N-1-r, N-1-c),
+    lambda r, c: (N-1-c, r),
+    lambda r, c: (r, N-1-c),
+    lambda r, c: (N-1-r, c),
+    lambda r, c: (c, r),
+    lambda r, c: (N-1-c, N-1-r),
+]
+
+
+def index(r, c):
+    return r * N + c
+
+
+def coords(i):
+    return divmod(i, N)
+
+
+def parse_cell(text):
+    """Parse a "row,col" command line argument into a bit index."""
+    r, c = (int(x) for x in text.split(","))
+    return index(r, c)
+
+
+class BitBoard:
+    def __init__(self, board):
+        self.valid = 0
+        self.start = 0
+        for r, row in enumerate(board):
+            for c, cell in enumerate(row):
+                if cell != 0:
+                    self.valid |= 1 << index(r, c)
+                if cell > 0:
+                    self.start |= 1 << index(r, c)
+        self.cells = [i for i in range(N*N) if self.valid >> i & 1]
+
+        # jump table: jump j moves the peg on src[j] over over[j] into dst[j]
+        self.src, self.over, self.dst, self.dirs = [], [], [], []
+        for i in self.cells:
+            r, c = coords(i)
+            for d, (dr, dc) in DIRECTIONS.items():
+                if not (0 <= r + 2*dr < N and 0 <= c + 2*dc < N):
+                    continue
+                o, k = index(r + dr, c + dc), index(r + 2*dr, c + 2*dc)
+                if self.valid >> o & 1 and self.valid >> k & 1:
+                    self.src.append(i)
+                    self.over.append(o)
+                    self.dst.append(k)
+                    self.dirs.append(d)
+        self.njumps = len(self.src)
+        self.need = [(1 << s) | (1 << o) for s, o in zip(self.src, self.over)]
+        self.hole = [1 << k for k in self.dst]
+        self.masks = [n | h for n, h in zip(self.need, self.hole)]
+        # jumps landing in each cell, so move generation can scan the holes
+        self.into = [[] for _ in range(N*N)]
+        for j, k in enumerate(self.dst):
+            self.into[k].append(j)
+
+        # keep the symmetries that map the playable area onto itself, as
+        # cell permutations plus per-row lookup tables for fast transforms
+        self.perms = []
+        for f in SYMMETRIES:
+            perm = [index(*f(*coords(i))) for i in range(N*N)]
+            if all(self.valid >> perm[i] & 1 for i in self.cells):
+                self.perms.append(perm)
+        self.tables = []
+        for perm in self.perms:
+            rows = []
+            for r in range(N):
+                table = [0] * (1 << N)
+                for v in range(1 << N):
+                    for c in range(N):
+                        if v >> c & 1:
+                            table[v] |= 1 << perm[index(r, c)]
+                rows.append(table)
+            self.tables.append(rows)
+
+    def moves(self, state):
+        """Indices of every legal jump from `state`, in jump-table order."""
+        need, hole = self.need, self.hole
+        return [j for j in range(self.njumps)
+                if state & need[j] == need[j] and not state & hole[j]]
+
+    def apply(self, state, j):
+        return state ^ self.masks[j]
+
+    def undo(self, state, j):
+        return state ^ self.masks[j]
+
+    def transform(self, state, k):
+        """Image of `state` under the k-th symmetry of this board."""
+        t0, t1, t2, t3, t4, t5, t6 = self.tables[k]
+        return (t0[state & 127] | t1[state >> 7 & 127] | t2[state >> 14 & 127]
+                | t3[state >> 21 & 127] | t4[state >> 28 & 127]
+                | t5[state >> 35 & 127] | t6[state >> 42 & 127])
+
+    def canonical(self, state, syms=None):
+        """Smallest image of `state` under `syms` (default: every symmetry)."""
+        best = state
+        for k in syms or range(1, len(self.tables)):
+            t0, t1, t2, t3, t4, t5, t6 = self.tables[k]
+            s = (t0[state & 127] | t1[state >> 7 & 127] | t2[state >> 14 & 127]
+                 | t3[state >> 21 & 127] | t4[state >> 28 & 127]
+                 | t5[state >> 35 & 127] | t6[state >> 42 & 127])
+            if s < best:
+                best = s
+        return best
+
+    def fixing(self, cell):
+        """Symmetries that leave `cell` in place (all of them for None)."""
+        if cell is None:
+            return list(range(len(self.perms)))
+        return [k for k, perm in enumerate(self.perms) if perm[cell] == cell]
+
+    def encode(self, board):
+        state = 0
+        for r, row in enumerate(board):
+            for c, cell in enumerate(row):
+                if cell > 0:
+                    state |= 1 << index(r, c)
+        return state
+
+    def decode(self, state):
+        """Unpack `state` into a list-of-lists board with numbered pegs."""
+        board = [[0] * N for _ in range(N)]
+        peg = 0
+        for i in self.cells:
+            r, c = coords(i)
+            if state >> i & 1:
+                peg += 1
+                board[r][c] = peg
+            else:
+                board[r][c] = -1
+        return board
+
+    def to_move(self, j):
+        """Jump j in the [row, col, direction] form the move lists print."""
+        r, c = coords(self.src[j])
+        return [r, c, self.dirs[j]]
+
+    def from_move(self, move):
+        i = index(move[0], move[1])
+        for j in range(self.njumps):
+            if self.src[j] == i and self.dirs[j] == move[2]:
+                return j
+        raise ValueError("not a jump on this board: %r" % (move,))
+
+    def is_solved(self, state, target=None):
+        if target is None:
+            return state != 0 and state & (state - 1) == 0
+        return state == 1 << target
+
+    def print_board(self, state):
+        for r in range(N):
+            for c in range(N):
+                i = index(r, c)
+                if not self.valid >> i & 1:
+                    print(' ', end='')
+                elif state >> i & 1:
+                    print('.', end='')
+                else:
+                    print('O', end='')
+            print('\n')
+
+
+def pegs(state):
+    return state.bit_count()
+
+
+def weight_tables(weights):
+    """Per-row lookup tables so `weigh` can sum a weight over every peg in
+    seven lookups. `weights` maps cell index -> weight."""
+    tables = []
+    for r in range(N):
+        table = [0] * (1 << N)
+        for v in range(1 << N):
+            for c in range(N):
+                if v >> c & 1:
+                    table[v] += weights.get(index(r, c), 0)
+        tables.append(table)
+    return tables
+
+
+def weigh(tables, state):
+    total = 0
+    for r in range(N):
+        total += tables[r][state >> (N * r) & 127]
+    return total
+
+
+def layout(name):
+    """BitBoard for a named layout ("british" or "european")."""
+    return BitBoard(LAYOUTS[name])
@@ -1,5 +1,11 @@
 #import numpy as np
-from os import system
+import curses
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from oracle import load_oracle
+from terminal import Counts, Screen, jump_cells
 
 P = 99 # player is 99
 N = 7 # board width
@@ -14,14 +20,18 @@ board = [[ 0,  0,  1,  2,  3,  0,  0],
 
 empties = []
 jumplist = []
-valids = 0
+# peg and jump counts, updated from the cells each jump changes
+counts = Counts(board)
+# built offline with `python oracle.py british`; without it there are no hints
+oracle = load_oracle("british")
+winnable = True
 
 class Player:
     def __init__(self):
         self.position = [3, 3]
         self.moves = []
 
-    def move(self, m):
+    def move(self, m, ask=input):
         match m:
             case "w":
                 if (self.position[0] > 0 
@@ -40,7 +50,7 @@ class Player:
                         and board[self.position[0]][self.position[1]+1] != 0):
                     self.position[1] += 1
             case " ":
-                self.jump(input("jump where? "))
+                self.jump(ask("jump where? "))
 
     def jump(self, j):
         match j:
@@ -90,62 +100,52 @@ class Player:
                     self.position[1] += 2
 
 
-def print_board(player):
-    for i, row, in enumerate(board):
-        for col in range(len(row)):
-            if ([i,col] == player.position):
-                print('X', end='')
-            elif (row[col] > 0):
-                print('.', end='')
-            elif (row[col] == 0):
-                print(' ', end='')
-            elif (row[col] < 0):
-                print('O', end='')
-        print('\n')
-    print("empties: ", empties)
-    print("jumplist: ", jumplist)
-    print("valids: ", valids)
+def status_lines():
+    lines = ["empties: %s" % empties,
+             "jumplist: %s" % jumplist,
+             "valids: %d" % counts.valids]
+    if (not winnable):
+        lines.append("this position can no longer be won")
+    return lines
 
 def check_loss():
-    global valids
-    valids = 0
-    for i, row in enumerate(board):
-        for col in range(len(row)):
-            if ((i > 1 and board[i-2][col] < 0 and board[i-1][col] > 0) or 
-                (col > 1 and board[i][col-2] < 0 and board[i][col-1] > 0) or 
-                (i < N-2 and board[i+2][col] < 0 and board[i+1][col] > 0) or
-                    (col < N-2 and board[i][col+2] < 0 and board[i][col+1] > 0)):
-                if (board[i][col] > 0):
-                    valids += 1
-    if (valids == 0):
-        game_over(0)
+    global winnable
+    if (counts.valids == 0):
+        return 0
+    if (oracle is not None):
+        winnable = oracle.is_winnable(counts.state)
 
 
 def check_win():
-    pegs = 0
-    for i, row in enumerate(board):
-        for col in range(len(row)):
-            if (board[i][col] > 0):
-                pegs+= 1
-        if (pegs > 1):
-            return
-    if (pegs == 1):
-        game_over(1)
-
-
-def game():
+    if (counts.pegs == 1):
+        return 1
+
+
+def game(stdscr):
     player = Player()
-    print_board(player)
-    print(player.position)
+    screen = Screen(stdscr, board)
+    screen.draw(player.position)
+    screen.status(status_lines())
     while True:
-        inp = input("move: ")
+        inp = screen.key()
         if (inp == "q"):
-            break
-        player.move(inp)
-        check_win()
-        check_loss()
-        system('clear')
-        print_board(player)
+            return None
+        before = list(player.position)
+        jumps = len(jumplist)
+        player.move(inp, screen.key)
+        changed = [before, player.position]
+        if (len(jumplist) > jumps):
+            cells = jump_cells(before, jumplist[-1][1])
+            counts.jumped(cells)
+            changed += cells
+        status = check_win()
+        if (status is None):
+            status = check_loss()
+        screen.cells(changed, player.position)
+        screen.status(status_lines())
+        if (status is not None):
+            screen.key("game over, press any key")
+            return status
 
 def game_over(status):
     if (status == 1):
@@ -156,4 +156,6 @@ def game_over(status):
     
 
 if __name__ == "__main__":
-    game()
+    status = curses.wrapper(game)
+    if (status is not None):
+        game_over(status)
@@ -1,3 +1,11 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from bitboard import BitBoard, DIRECTIONS, index
+from por import SleepDFS
+from ordering import policy
+
 EMPTY = -1
 PEG = 1
 VOID = 0
@@ -28,11 +36,11 @@ class PegSolitaire:
                 if (board[i][col] > 0):
                     if (i > 1 and board[i-2][col] < 0 and board[i-1][col] > 0):
                         valids.append([i,col,"w",board[i-1][col]])
-                    elif (col > 1 and board[i][col-2] < 0 and board[i][col-1] > 0): 
+                    if (col > 1 and board[i][col-2] < 0 and board[i][col-1] > 0): 
                         valids.append([i,col,"a",board[i][col-1]])
-                    elif (i < N-2 and board[i+2][col] < 0 and board[i+1][col] > 0):
+                    if (i < N-2 and board[i+2][col] < 0 and board[i+1][col] > 0):
                         valids.append([i,col,"s",board[i+1][col]])
-                    elif (col < N-2 and board[i][col+2] < 0 and board[i][col+1] > 0):
+                    if (col < N-2 and board[i][col+2] < 0 and board[i][col+1] > 0):
                         valids.append([i,col,"d",board[i][col+1]])
         print("VALID MOVES:", valids)
         print("MOVES thus far:", self.moves)
@@ -93,6 +101,24 @@ class PegSolitaire:
             self.undo_move()
         return False
 
+    def replay(self, bb, jumps):
+        # jumps found on the packed board, made here so self.moves ends up
+        # in the same form solve() leaves it
+        for j in jumps:
+            r, c, d = bb.to_move(j)
+            dr, dc = DIRECTIONS[d]
+            self.make_move([r, c, d, board[r+dr][c+dc]])
+
+    def solve_por(self, visited=True, order="scan"):
+        # solve() with sleep sets: one order of each commuting pair of jumps
+        bb = BitBoard(board)
+        jumps = SleepDFS(bb, index(3, 3), visited=visited,
+                         order=policy(order, bb)).solve(bb.encode(board))
+        if jumps is None:
+            return False
+        self.replay(bb, jumps)
+        return True
+
     def print_moves(self):
         print(self.moves)
         print(len(self.moves))
@@ -117,6 +143,12 @@ if __name__ == "__main__":
              [ 0,  0, 27, 28, 29,  0,  0],
              [ 0,  0, 30, 31, 32,  0,  0]]
     game = PegSolitaire(board)
-    game.solve()
+    # python dfs.py por [policy]: the same search with partial-order
+    # reduction, moves ordered by an ordering.py policy
+    if len(sys.argv) > 1 and sys.argv[1] == "por":
+        sys.setrecursionlimit(10000)
+        game.solve_por(order=sys.argv[2] if len(sys.argv) > 2 else "scan")
+    else:
+        game.solve()
     game.print_moves()
 
@@ -1,3 +1,13 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from bitboard import BitBoard, DIRECTIONS
+from bestfirst import BestFirst
+from anytime import Anytime
+from por import SleepDFS
+from ordering import policy
+from pns import ProofNumberSearch
 
 N = 7
 
@@ -125,6 +135,45 @@ class PegSolitaire:
 
         return False
 
+    def replay(self, bb, jumps):
+        # jumps found on the packed board, made here so self.moves ends up
+        # exactly as dfs() would leave it
+        for j in jumps:
+            r, c, d = bb.to_move(j)
+            dr, dc = DIRECTIONS[d]
+            self.make_move([r, c, d, self.board[r+dr][c+dc]])
+
+    def best_first(self, **options):
+        bb = BitBoard(self.board)
+        jumps = BestFirst(bb, **options).solve(bb.encode(self.board))
+        if jumps is None:
+            return False
+        self.replay(bb, jumps)
+        return True
+
+    def anytime(self, budget=0.2, **options):
+        # best position found within `budget` seconds, even if not solved
+        bb = BitBoard(self.board)
+        state, jumps = Anytime(bb, budget=budget, **options).solve(bb.encode(self.board))
+        self.replay(bb, jumps)
+        return bb.is_solved(state)
+
+    def dfs_por(self, visited=True, order="scan"):
+        # dfs() with sleep sets: one order of each commuting pair of jumps
+        bb = BitBoard(self.board)
+        jumps = SleepDFS(bb, visited=visited,
+                         order=policy(order, bb)).solve(bb.encode(self.board))
+        if jumps is None:
+            return False
+        self.replay(bb, jumps)
+        return True
+
+    def prove(self, **options):
+        # True if no sequence of jumps leaves a single peg; answers without
+        # exhausting dfs() when an invariant or df-pn settles it first
+        bb = BitBoard(self.board)
+        return not ProofNumberSearch(bb, **options).solve(bb.encode(self.board))
+
     def print_moves(self):
         print(self.moves)
         print(len(self.moves))
@@ -153,6 +202,23 @@ if __name__ == "__main__":
              [ 0, 30, 31, 32, 33, 34,  0],
              [ 0,  0, 35, 36, -1,  0,  0]]
     game = PegSolitaire(board, [], 0, 0)
-    game.dfs()
+    # python search.py astar|anytime|por: best-first, a 200 ms best effort
+    # or the DFS with partial-order reduction instead of the plain DFS;
+    # por takes an ordering.py policy, e.g. python search.py por history.
+    # python search.py prove: only decide whether a finish exists
+    mode = sys.argv[1] if len(sys.argv) > 1 else "dfs"
+    if mode == "astar":
+        game.best_first()
+    elif mode == "anytime":
+        game.anytime()
+    elif mode == "por":
+        sys.setrecursionlimit(10000)
+        game.dfs_por(order=sys.argv[2] if len(sys.argv) > 2 else "scan")
+    elif mode == "prove":
+        sys.setrecursionlimit(10000)
+        print("unsolvable" if game.prove() else "solvable")
+        sys.exit()
+    else:
+        game.dfs()
     game.print_moves()
 
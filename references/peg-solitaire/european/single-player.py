@@ -1,5 +1,18 @@
 #import numpy as np
-from os import system
+import asyncio
+import curses
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from oracle import load_oracle
+from terminal import Counts, Screen, jump_cells
+from bitboard import layout
+from hints import HintEngine
+try:
+    from rollout import Rollouts
+except ImportError:
+    Rollouts = None
 
 P = 99 # player is 99
 N = 7 # board width
@@ -14,14 +27,24 @@ board = [[ 0,  0,  1,  2,  3,  0,  0],
 
 empties = []
 jumplist = []
-valids = 0
+# peg and jump counts, updated from the cells each jump changes
+counts = Counts(board)
+# built offline with `python oracle.py european`; without it there are no hints
+oracle = load_oracle("european")
+winnable = True
+# "h" plays random games from each jump; needs numpy
+rollouts = Rollouts(layout("european")) if Rollouts is not None else None
+# shown under the board until the next jump
+hints = []
+# "f" searches from here in a worker process, started on first use
+engine = None
 
 class Player:
     def __init__(self):
         self.position = [6, 4]
         self.moves = []
 
-    def move(self, m):
+    def move(self, m, ask=input):
         match m:
             case "w":
                 if (self.position[0] > 0 
@@ -40,7 +63,9 @@ class Player:
                         and board[self.position[0]][self.position[1]+1] != 0):
                     self.position[1] += 1
             case " ":
-                self.jump(input("jump where? "))
+                self.jump(ask("jump where? "))
+            case "h":
+                rollout_hints()
 
     def jump(self, j):
         match j:
@@ -90,62 +115,84 @@ class Player:
                     self.position[1] += 2
 
 
-def print_board(player):
-    for i, row, in enumerate(board):
-        for col in range(len(row)):
-            if ([i,col] == player.position):
-                print('X', end='')
-            elif (row[col] > 0):
-                print('.', end='')
-            elif (row[col] == 0):
-                print(' ', end='')
-            elif (row[col] < 0):
-                print('O', end='')
-        print('\n')
-    print("empties: ", empties)
-    print("jumplist: ", jumplist)
-    print("valids: ", valids)
+def status_lines():
+    lines = ["empties: %s" % empties,
+             "jumplist: %s" % jumplist,
+             "valids: %d" % counts.valids]
+    if (not winnable):
+        lines.append("this position can no longer be won")
+    lines.extend(hints)
+    return lines
+
+def rollout_hints(games=20000):
+    hints.clear()
+    if (rollouts is None):
+        hints.append("no hints: rollouts need numpy")
+        return
+    bb = rollouts.bb
+    stats = rollouts.by_move(bb.encode(board), games)
+    for j in sorted(stats, key=lambda j: stats[j].mean):
+        hints.append("%s %s" % (bb.to_move(j), stats[j]))
+
+async def search_hints(screen):
+    """Show each better line the engine finds until it is done or cancelled."""
+    global engine
+    if (engine is None):
+        engine = HintEngine("european")
+    hints.clear()
+    async for hint in engine.hints(counts.state):
+        # each line found replaces the one before
+        hints[:] = ["best line: %s" % hint]
+        screen.show(status_lines())
 
 def check_loss():
-    global valids
-    valids = 0
-    for i, row in enumerate(board):
-        for col in range(len(row)):
-            if ((i > 1 and board[i-2][col] < 0 and board[i-1][col] > 0) or 
-                (col > 1 and board[i][col-2] < 0 and board[i][col-1] > 0) or 
-                (i < N-2 and board[i+2][col] < 0 and board[i+1][col] > 0) or
-                    (col < N-2 and board[i][col+2] < 0 and board[i][col+1] > 0)):
-                if (board[i][col] > 0):
-                    valids += 1
-    if (valids == 0):
-        game_over(0)
+    global winnable
+    if (counts.valids == 0):
+        return 0
+    if (oracle is not None):
+        winnable = oracle.is_winnable(counts.state)
 
 
 def check_win():
-    pegs = 0
-    for i, row in enumerate(board):
-        for col in range(len(row)):
-            if (board[i][col] > 0):
-                pegs+= 1
-        if (pegs > 1):
-            return
-    if (pegs == 1):
-        game_over(1)
-
-
-def game():
+    if (counts.pegs == 1):
+        return 1
+
+
+async def game(stdscr):
     player = Player()
-    print_board(player)
-    print(player.position)
+    screen = Screen(stdscr, board)
+    screen.draw(player.position)
+    screen.status(status_lines())
+    search = None
     while True:
-        inp = input("move: ")
+        inp = await screen.key_async()
+        # any keypress makes a running search's hints outdated
+        if (search is not None):
+            search.cancel()
+            search = None
         if (inp == "q"):
-            break
-        player.move(inp)
-        check_win()
-        check_loss()
-        system('clear')
-        print_board(player)
+            return None
+        if (inp == "f"):
+            search = asyncio.create_task(search_hints(screen))
+            continue
+        before = list(player.position)
+        jumps = len(jumplist)
+        player.move(inp, screen.key)
+        changed = [before, player.position]
+        if (len(jumplist) > jumps):
+            cells = jump_cells(before, jumplist[-1][1])
+            counts.jumped(cells)
+            changed += cells
+            # hints were for the position before the jump
+            hints.clear()
+        status = check_win()
+        if (status is None):
+            status = check_loss()
+        screen.cells(changed, player.position)
+        screen.status(status_lines())
+        if (status is not None):
+            screen.key("game over, press any key")
+            return status
 
 def game_over(status):
     if (status == 1):
@@ -156,4 +203,8 @@ def game_over(status):
     
 
 if __name__ == "__main__":
-    game()
+    status = curses.wrapper(lambda stdscr: asyncio.run(game(stdscr)))
+    if (engine is not None):
+        engine.close()
+    if (status is not None):
+        game_over(status)
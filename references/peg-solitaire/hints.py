@@ -0,0 +1,201 @@
+"""
+Asynchronous hints: search from the current position without blocking.
+
+`HintEngine.hints(state)` is an async generator. It hands the position to an
+anytime search (anytime.py) in a worker process and yields a Hint every time
+that search finds a line leaving fewer pegs, ending with a final one when the
+search solves the position, exhausts it or runs out of budget. The search
+runs in another process, so neither the GIL nor the search's CPU time slows
+the caller's event loop.
+
+Every search carries a generation number, and the workers poll a shared
+counter as they go. Starting a new search, calling cancel() or cancelling the
+task that iterates hints() bumps the counter, and the outdated search stops
+within a few hundred nodes. Its late results are dropped and its hints()
+generator ends, so a keypress that changes the board never shows hints for
+the old one.
+
+    python hints.py european --hole 6,4 --budget 2
+"""
+import argparse
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from anytime import Anytime
+from bitboard import layout, parse_cell, pegs
+
+# polling the shared counter costs a lock; every this many nodes is plenty
+POLL = 256
+
+
+class Hint:
+    """The best line a search has found so far."""
+    def __init__(self, bb, state, jumps, nodes, final=False):
+        self.bb = bb
+        self.state = state
+        self.jumps = jumps
+        self.nodes = nodes
+        self.final = final
+
+    @property
+    def pegs(self):
+        return pegs(self.state)
+
+    @property
+    def move(self):
+        """The jump to make now, as [row, col, direction], or None."""
+        return self.bb.to_move(self.jumps[0]) if self.jumps else None
+
+    def __repr__(self):
+        return "%s -> %d pegs in %d jumps (%d nodes%s)" % (
+            self.move, self.pegs, len(self.jumps), self.nodes, ", final" if self.final else "")
+
+
+class Cancelled(Exception):
+    pass
+
+
+class Streaming(Anytime):
+    """Anytime search that reports each improvement and stops when its
+    generation is no longer the current one."""
+    def __init__(self, bb, target, budget, generation, gen, report):
+        super().__init__(bb, target, budget)
+        self.generation = generation
+        self.gen = gen
+        self.report = report
+
+    def tick(self):
+        if self.nodes % POLL == 0 and self.generation.value != self.gen:
+            raise Cancelled
+        super().tick()
+
+    def consider(self, state, link):
+        before = self.best_rank
+        super().consider(state, link)
+        if self.best_rank < before:
+            self.report(self.gen, state, self.chain(link), self.nodes, False)
+
+    @staticmethod
+    def chain(link):
+        jumps = []
+        while link is not None:
+            j, link = link
+            jumps.append(j)
+        jumps.reverse()
+        return jumps
+
+
+# set in each worker process by _start
+_worker = None
+
+
+def _start(board, target, generation, results):
+    global _worker
+    _worker = (layout(board), target, generation, results)
+
+
+def _search(gen, state, budget):
+    bb, target, generation, results = _worker
+
+    def report(gen, state, jumps, nodes, final):
+        results.put((gen, state, jumps, nodes, final))
+
+    search = Streaming(bb, target, budget, generation, gen, report)
+    try:
+        best, jumps = search.solve(state)
+    except Cancelled:
+        return
+    report(gen, best, jumps, search.nodes, True)
+
+
+class HintEngine:
+    def __init__(self, board, target=None, budget=2.0, workers=1):
+        self.bb = layout(board)
+        self.budget = budget
+        ctx = multiprocessing.get_context()
+        self.generation = ctx.Value("Q", 0)
+        self.results = ctx.SimpleQueue()
+        self.pool = ProcessPoolExecutor(workers, ctx, initializer=_start,
+                                        initargs=(board, target, self.generation, self.results))
+        # the current listener: (generation, loop, asyncio.Queue)
+        self.listener = None
+        self.reader = threading.Thread(target=self.read, daemon=True)
+        self.reader.start()
+
+    def read(self):
+        """Forward worker results to the listener of their generation."""
+        while True:
+            item = self.results.get()
+            if item is None:
+                return
+            listener = self.listener
+            if listener is not None and listener[0] == item[0]:
+                listener[1].call_soon_threadsafe(listener[2].put_nowait, item)
+
+    def replace(self, listener):
+        """Make `listener` current; the previous one's hints() just ends."""
+        with self.generation.get_lock():
+            self.generation.value += 1
+            old, self.listener = self.listener, listener
+        if old is not None:
+            old[1].call_soon_threadsafe(old[2].put_nowait, None)
+        return self.generation.value
+
+    def cancel(self):
+        """Stop whichever search is running."""
+        self.replace(None)
+
+    async def hints(self, state, budget=None):
+        """Yield ever better Hints for the packed position `state`, the
+        last one with final set. Any earlier search is cancelled."""
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        with self.generation.get_lock():
+            gen = self.generation.value + 1
+            self.replace((gen, loop, queue))
+        self.pool.submit(_search, gen, state, self.budget if budget is None else budget)
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                _, best, jumps, nodes, final = item
+                yield Hint(self.bb, best, jumps, nodes, final)
+                if final:
+                    return
+        finally:
+            if self.generation.value == gen:
+                self.cancel()
+
+    def close(self):
+        self.cancel()
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        self.results.put(None)
+        self.reader.join()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+
+async def main(args):
+    target = parse_cell(args.target) if args.target else None
+    start = layout(args.board).valid ^ (1 << parse_cell(args.hole))
+    async with HintEngine(args.board, target, args.budget) as engine:
+        t0 = time.perf_counter()
+        async for hint in engine.hints(start):
+            print("%7.3fs %s" % (time.perf_counter() - t0, hint))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("board", choices=["british", "european"])
+    parser.add_argument("--hole", default="3,3", help="starting vacancy as row,col")
+    parser.add_argument("--target", help="finishing cell as row,col")
+    parser.add_argument("--budget", type=float, default=2.0, help="seconds per search")
+    asyncio.run(main(parser.parse_args()))
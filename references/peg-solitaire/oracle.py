@@ -0,0 +1,176 @@
+"""
+Winnability oracle.
+
+The offline build enumerates every position reachable from a start layer by
+layer, then works back up from the layer with the fewest pegs (retrograde
+analysis): a position is winnable when it is finished or one of its children
+is winnable. The winnable positions, reduced by symmetry, go into an
+open-addressing hash table on disk. At runtime the file is memory-mapped and
+`is_winnable(state)` is one canonicalisation plus an expected O(1) probe, so
+the game loops can warn the moment a position stops being winnable.
+
+A plain bitset over every packed position would need 2^33 bits (1 GiB) on
+the British board and 16 GiB on the European, so only the winnable keys are
+stored. Positions that are not reachable from the start a table was built
+for read as unwinnable.
+
+    python oracle.py british
+    python oracle.py european --hole 6,4 --target 3,3
+"""
+import argparse
+import mmap
+import os
+import struct
+import time
+from array import array
+
+from bitboard import coords, layout, parse_cell
+
+MAGIC = b"PEGO"
+BOARDS = ["british", "european"]
+ANY = 255
+# magic, board, target (ANY for a single peg anywhere), start, slot bits, count
+HEADER = struct.Struct("<4sBB2xQQQ")
+GOLDEN = 0x9E3779B97F4A7C15
+MASK64 = (1 << 64) - 1
+
+# the starts the game loops use: british/board.py and european/single-player.py
+DEFAULT_HOLES = {"british": "3,3", "european": "6,4"}
+
+TABLES = os.path.dirname(os.path.abspath(__file__))
+
+
+def table_path(board, target=None):
+    if target is None:
+        name = "%s-any.oracle" % board
+    else:
+        name = "%s-%d-%d.oracle" % ((board,) + coords(target))
+    return os.path.join(TABLES, name)
+
+
+def slot(key, bits):
+    return ((key * GOLDEN) & MASK64) >> (64 - bits)
+
+
+def winnable_positions(bb, start, target=None, verbose=False):
+    """Canonical keys of every position reachable from `start` that can
+    still finish (on `target`, or anywhere when it is None)."""
+    syms = bb.fixing(target)
+
+    def key(state):
+        return bb.canonical(state, syms)
+
+    # forward: each layer holds canonical positions, which are themselves
+    # positions, so they can be expanded directly
+    t0 = time.time()
+    layers = [{key(start)}]
+    while True:
+        nxt = set()
+        for s in layers[-1]:
+            for j in bb.moves(s):
+                nxt.add(key(s ^ bb.masks[j]))
+        if not nxt:
+            break
+        layers.append(nxt)
+    if verbose:
+        print("forward: %d positions in %d layers, %.1fs"
+              % (sum(map(len, layers)), len(layers), time.time() - t0))
+
+    # backward: a position is winnable if any child is
+    t0 = time.time()
+    winnable = set()
+    below = set()
+    while layers:
+        layer = layers.pop()
+        here = set()
+        for s in layer:
+            if bb.is_solved(s, target):
+                here.add(s)
+                continue
+            for j in bb.moves(s):
+                if key(s ^ bb.masks[j]) in below:
+                    here.add(s)
+                    break
+        winnable |= here
+        below = here
+    if verbose:
+        print("backward: %d winnable, %.1fs" % (len(winnable), time.time() - t0))
+    return winnable
+
+
+def write_table(path, board, start, target, keys):
+    bits = max(4, (2 * len(keys) - 1).bit_length())
+    size = 1 << bits
+    slots = array("Q", bytes(8 * size))
+    for key in keys:
+        i = slot(key, bits)
+        while slots[i]:
+            i = (i + 1) & (size - 1)
+        slots[i] = key
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, BOARDS.index(board),
+                            ANY if target is None else target,
+                            start, bits, len(keys)))
+        f.write(slots.tobytes())
+
+
+class Oracle:
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, board, target, self.start, self.bits, self.count = \
+            HEADER.unpack_from(self.mm)
+        if magic != MAGIC:
+            raise ValueError("%s is not a winnability table" % path)
+        self.board = BOARDS[board]
+        self.target = None if target == ANY else target
+        self.bb = layout(self.board)
+        self.syms = self.bb.fixing(self.target)
+        self.mask = (1 << self.bits) - 1
+        self.slots = memoryview(self.mm)[HEADER.size:].cast("Q")
+
+    def is_winnable(self, state):
+        key = self.bb.canonical(state, self.syms)
+        i = slot(key, self.bits)
+        slots = self.slots
+        while True:
+            v = slots[i]
+            if v == key:
+                return True
+            if v == 0:
+                return False
+            i = (i + 1) & self.mask
+
+    def close(self):
+        self.slots.release()
+        self.mm.close()
+        self.file.close()
+
+
+def load_oracle(board, target=None):
+    """The table for `board` if it has been built, else None."""
+    path = table_path(board, target)
+    if not os.path.exists(path):
+        return None
+    return Oracle(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("board", choices=BOARDS)
+    parser.add_argument("--hole", help="starting vacancy as row,col")
+    parser.add_argument("--target", help="finishing cell as row,col (default: anywhere)")
+    parser.add_argument("-o", "--output", help="table file to write")
+    args = parser.parse_args()
+
+    bb = layout(args.board)
+    start = bb.valid ^ (1 << parse_cell(args.hole or DEFAULT_HOLES[args.board]))
+    target = parse_cell(args.target) if args.target else None
+    path = args.output or table_path(args.board, target)
+
+    keys = winnable_positions(bb, start, target, verbose=True)
+    write_table(path, args.board, start, target, keys)
+    oracle = Oracle(path)
+    print("wrote %s: %d keys, %d bytes, start %s"
+          % (path, oracle.count, os.path.getsize(path),
+             "winnable" if oracle.is_winnable(start) else "not winnable"))
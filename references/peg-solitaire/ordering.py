@@ -0,0 +1,100 @@
+"""
+Move ordering for the peg solitaire DFS.
+
+The game loops list jumps in row-major scan order, so which solution the DFS
+finds first -- and how long it takes -- depends on where the start hole
+happens to sit. A policy reorders the legal jumps at each node:
+
+    scan     jump-table order, the old behaviour
+    corner   static: jumps out of the arms and corners first
+    history  jumps that led deep elsewhere in the search first
+    killer   the jumps that led deepest at the same depth first
+
+The first-solution DFS has no cutoffs to learn from, so the dynamic policies
+reward the child that got furthest -- fewest pegs left -- once a node has
+been searched without success. `python bench.py` scores the policies.
+"""
+from bitboard import N, coords
+
+
+class Scan:
+    def order(self, moves, depth):
+        return moves
+
+    def reward(self, j, depth, reach):
+        pass
+
+
+class CornerFirst(Scan):
+    """Jumps starting furthest from the centre first, clearing the arms
+    before they can be cut off."""
+    def __init__(self, bb):
+        mid = N // 2
+        self.rank = []
+        for i in bb.src:
+            r, c = coords(i)
+            self.rank.append(-(abs(r - mid) + abs(c - mid)))
+
+    def order(self, moves, depth):
+        return sorted(moves, key=self.rank.__getitem__)
+
+
+class History(Scan):
+    """Jumps scored by how deep their subtrees reached, across the search."""
+    def __init__(self, bb):
+        self.score = [0] * bb.njumps
+
+    def order(self, moves, depth):
+        score = self.score
+        return sorted(moves, key=lambda j: -score[j])
+
+    def reward(self, j, depth, reach):
+        self.score[j] += (reach - depth) ** 2
+
+
+class Killer(Scan):
+    """The last two jumps that reached deepest at each depth, tried first."""
+    def __init__(self, bb, slots=2):
+        self.slots = slots
+        self.killers = [[] for _ in range(len(bb.cells))]
+
+    def order(self, moves, depth):
+        first = [j for j in self.killers[depth] if j in moves]
+        if not first:
+            return moves
+        return first + [j for j in moves if j not in first]
+
+    def reward(self, j, depth, reach):
+        killers = self.killers[depth]
+        if j in killers:
+            killers.remove(j)
+        killers.insert(0, j)
+        del killers[self.slots:]
+
+
+class KillerHistory(History):
+    """Killer jumps first, the rest by history score."""
+    def __init__(self, bb):
+        super().__init__(bb)
+        self.killer = Killer(bb)
+
+    def order(self, moves, depth):
+        return self.killer.order(super().order(moves, depth), depth)
+
+    def reward(self, j, depth, reach):
+        super().reward(j, depth, reach)
+        self.killer.reward(j, depth, reach)
+
+
+POLICIES = {
+    "scan": lambda bb: Scan(),
+    "corner": CornerFirst,
+    "history": History,
+    "killer": Killer,
+    "killer+history": KillerHistory,
+}
+
+
+def policy(name, bb):
+    """A fresh policy object; dynamic ones learn within a single search."""
+    return POLICIES[name](bb)
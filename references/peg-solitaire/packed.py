@@ -0,0 +1,17 @@
+"""
+NumPy helpers for arrays of packed positions (uint64, bitboard.py's layout),
+shared by the vectorised modules. bitboard.py itself stays free of NumPy so
+the game loops run without it.
+"""
+import numpy as np
+
+# set bits in a byte, for popcount() where NumPy has no np.bitwise_count
+BYTE_BITS = np.array([bin(v).count("1") for v in range(256)], dtype=np.uint8)
+
+
+def popcount(states):
+    """Pegs in each packed position of a uint64 array."""
+    if hasattr(np, "bitwise_count"):  # NumPy 2.0 and later
+        return np.bitwise_count(states)
+    states = np.ascontiguousarray(states, dtype=np.uint64)
+    return BYTE_BITS[states.view(np.uint8).reshape(states.shape + (8,))].sum(axis=-1, dtype=np.uint8)
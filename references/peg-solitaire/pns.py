@@ -0,0 +1,246 @@
+"""
+Depth-first proof-number search, to prove positions have no finish.
+
+Peg solitaire is a one-player game, so every node is an OR node: a position
+is won if any child is won and lost only once every child is lost. df-pn
+keeps a proof number (how many leaves must still be won to show it can
+finish) and a disproof number (how many must be lost to show it cannot) for
+every position, and always descends into the child with the smallest proof
+number, so it spends its effort where the disproof is cheapest and never
+revisits a subtree already settled.
+
+Leaves are refuted without search by three invariants: no jump left, the
+position class (pegs counted on the two sets of diagonals mod 3 keep their
+parities, so a position can only ever shrink to a single peg in the same
+class -- this alone disproves the centre-vacant European board), and the
+golden-ratio pagoda from bestfirst.py, which must leave enough for at least
+one finishing cell of that class.
+
+Unsettled positions live in a bounded transposition table. Positions lost
+after search are kept apart: they are the certificate, and `check` verifies
+it by regenerating each position's children and finding every one of them
+either in the certificate or refuted by an invariant.
+
+    python pns.py european --hole 3,3
+    python pns.py british --hole 3,3 --target 0,2 -o british.cert
+    python pns.py --check british.cert
+"""
+import argparse
+import struct
+import sys
+import time
+from array import array
+
+from bestfirst import pagoda
+from bitboard import coords, layout, parse_cell
+from oracle import ANY, BOARDS
+
+INF = 1 << 62
+
+MAGIC = b"PEGC"
+# magic, board, target (ANY for a single peg anywhere), root, keys
+HEADER = struct.Struct("<4sBB2xQQ")
+
+
+def class_masks(bb):
+    """The cells on each of the three diagonals mod 3, in both directions."""
+    masks = []
+    for f in (lambda r, c: (r + c) % 3, lambda r, c: (r - c) % 3):
+        diag = [0, 0, 0]
+        for i in bb.cells:
+            diag[f(*coords(i))] |= 1 << i
+        masks.append(diag)
+    return masks
+
+
+def position_class(masks, state):
+    """A jump flips the parity of all three diagonal counts, so the parities
+    of their pairwise sums never change."""
+    cls = 0
+    for diag in masks:
+        n0, n1, n2 = ((state & d).bit_count() for d in diag)
+        cls = cls << 2 | ((n0 + n1) & 1) << 1 | (n1 + n2) & 1
+    return cls
+
+
+class Refuter:
+    """Cheap, search-free reasons a position can never finish."""
+    def __init__(self, bb, target=None):
+        self.bb = bb
+        self.masks = class_masks(bb)
+        # finishing cells by class, each with its pagoda function
+        self.finishes = {}
+        for k in bb.cells if target is None else [target]:
+            cls = position_class(self.masks, 1 << k)
+            self.finishes.setdefault(cls, []).append(pagoda(bb, k))
+
+    def __call__(self, state, moves):
+        """Why `state` is lost, or None if that takes a search."""
+        if not moves:
+            return "dead"
+        pagodas = self.finishes.get(position_class(self.masks, state))
+        if pagodas is None:
+            return "class"
+        for score in pagodas:
+            if score(state) is not None:
+                return None
+        return "pagoda"
+
+
+class ProofNumberSearch:
+    def __init__(self, bb, target=None, max_tt=2_000_000):
+        self.bb = bb
+        self.target = target
+        self.syms = bb.fixing(target)
+        self.refute = Refuter(bb, target)
+        self.max_tt = max_tt
+        # unsettled: key -> [pn, dn, work]; lost keeps the keys disproved by
+        # search, dead the ones refuted outright, which a check redoes
+        self.tt = {}
+        self.lost = set()
+        self.dead = set()
+        self.nodes = 0
+        self.evicted = 0
+
+    def key(self, state):
+        return self.bb.canonical(state, self.syms)
+
+    def lookup(self, state, k):
+        """(pn, dn) of position `state` with key `k`, evaluated and stored
+        on first sight."""
+        if k in self.lost or k in self.dead:
+            return INF, 0
+        entry = self.tt.get(k)
+        if entry is not None:
+            return entry[0], entry[1]
+        if self.bb.is_solved(state, self.target):
+            return 0, INF
+        moves = self.bb.moves(state)
+        if self.refute(state, moves):
+            self.dead.add(k)
+            return INF, 0
+        self.store(k, 1, len(moves), 0)
+        return 1, len(moves)
+
+    def store(self, k, pn, dn, work):
+        if dn == 0:
+            self.lost.add(k)
+            self.tt.pop(k, None)
+            return
+        self.tt[k] = [pn, dn, work]
+        if len(self.tt) > self.max_tt:
+            # keep the half that took the most search to get to
+            keep = sorted(self.tt.items(), key=lambda kv: -kv[1][2])[:self.max_tt // 2]
+            self.evicted += len(self.tt) - len(keep)
+            self.tt = dict(keep)
+
+    def mid(self, state, k, thpn, thdn):
+        """Search under `state` until its pn or dn reaches its threshold."""
+        self.nodes += 1
+        start = self.nodes
+        children = []
+        for j in self.bb.moves(state):
+            child = state ^ self.bb.masks[j]
+            children.append((child, self.key(child)))
+        while True:
+            pn, dn = INF, 0
+            best = second = INF
+            pick = None
+            for child, ck in children:
+                cpn, cdn = self.lookup(child, ck)
+                dn = min(dn + cdn, INF)
+                if cpn < best:
+                    second, best, pick, pick_dn = best, cpn, (child, ck), cdn
+                elif cpn < second:
+                    second = cpn
+                pn = min(pn, cpn)
+            if pn >= thpn or dn >= thdn:
+                break
+            self.mid(*pick, min(thpn, second + 1), thdn - dn + pick_dn)
+        self.store(k, pn, dn, self.nodes - start)
+        return pn, dn
+
+    def solve(self, start):
+        """True if `start` can finish, False if it cannot."""
+        k = self.key(start)
+        pn, dn = self.lookup(start, k)
+        if pn and dn:
+            pn, dn = self.mid(start, k, INF, INF)
+        return pn == 0
+
+
+def write_certificate(path, board, target, root, keys):
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, BOARDS.index(board),
+                            ANY if target is None else target, root, len(keys)))
+        f.write(array("Q", sorted(keys)).tobytes())
+
+
+def read_certificate(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, board, target, root, count = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("%s is not a proof certificate" % path)
+    keys = array("Q")
+    keys.frombytes(data[HEADER.size:HEADER.size + 8 * count])
+    return BOARDS[board], None if target == ANY else target, root, keys
+
+
+def check(bb, target, root, keys):
+    """True if `keys` shows `root` cannot finish: every key's children are
+    either keys themselves or refuted outright."""
+    syms = bb.fixing(target)
+    refute = Refuter(bb, target)
+    lost = set(keys)
+
+    def settled(state):
+        if bb.canonical(state, syms) in lost:
+            return True
+        if bb.is_solved(state, target):
+            return False
+        return refute(state, bb.moves(state)) is not None
+
+    if not settled(root):
+        return False
+    for k in lost:
+        if bb.is_solved(k, target):
+            return False
+        for j in bb.moves(k):
+            if not settled(k ^ bb.masks[j]):
+                return False
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("board", nargs="?", choices=BOARDS)
+    parser.add_argument("--hole", default="3,3", help="starting vacancy as row,col")
+    parser.add_argument("--target", help="finishing cell as row,col (default: anywhere)")
+    parser.add_argument("--max-tt", type=int, default=2_000_000)
+    parser.add_argument("-o", "--output", help="certificate file to write")
+    parser.add_argument("--check", metavar="CERT", help="verify a certificate")
+    args = parser.parse_args()
+
+    sys.setrecursionlimit(10000)
+    t0 = time.time()
+    if args.check:
+        board, target, root, keys = read_certificate(args.check)
+        ok = check(layout(board), target, root, keys)
+        print("%s: %d keys, %s, %.2fs" % (args.check, len(keys),
+              "valid" if ok else "INVALID", time.time() - t0))
+        sys.exit(0 if ok else 1)
+    if args.board is None:
+        parser.error("a board or --check is required")
+
+    bb = layout(args.board)
+    target = parse_cell(args.target) if args.target else None
+    start = bb.valid ^ (1 << parse_cell(args.hole))
+    search = ProofNumberSearch(bb, target, args.max_tt)
+    won = search.solve(start)
+    print("%s: %d nodes, %d lost positions kept, %d evicted, %.2fs"
+          % ("can finish" if won else "cannot finish", search.nodes,
+             len(search.lost), search.evicted, time.time() - t0))
+    if not won and args.output:
+        write_certificate(args.output, args.board, target, start, search.lost)
+        print("wrote", args.output)
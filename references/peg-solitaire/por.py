@@ -0,0 +1,134 @@
+"""
+Partial-order reduction for the peg solitaire DFS.
+
+Two jumps whose three cells are disjoint commute: either order gives the same
+position, and neither can enable or disable the other. The independence
+relation is read once off the jump table, and the DFS then carries a sleep
+set (Godefroid): after a jump has been explored from a position, it stays
+asleep in the siblings explored later for as long as the jumps taken are
+independent of it, so only one order of every commuting pair is expanded.
+
+Sleep sets keep every reachable position reachable, so a DFS with no visited
+set at all still finds a solution, without generating the duplicate children
+it used to. With a visited set, a position is skipped only if it was
+explored before with a sleep set no larger than the current one.
+
+    python por.py european --hole 6,4
+    python por.py british --target 3,3 --no-visited --order history
+"""
+import argparse
+import sys
+import time
+
+from bitboard import layout, parse_cell
+from ordering import POLICIES, Scan, policy
+
+
+def independence(bb):
+    """indep[j]: bitmask of the jumps that touch none of jump j's cells."""
+    indep = []
+    for j in range(bb.njumps):
+        bits = 0
+        for k in range(bb.njumps):
+            if not bb.masks[j] & bb.masks[k]:
+                bits |= 1 << k
+        indep.append(bits)
+    return indep
+
+
+class NodeLimit(Exception):
+    pass
+
+
+class SleepDFS:
+    def __init__(self, bb, target=None, visited=True, order=None, max_nodes=None):
+        self.bb = bb
+        self.target = target
+        self.indep = independence(bb)
+        self.visited = {} if visited else None
+        # an ordering.py policy; see there
+        self.order = order or Scan()
+        self.max_nodes = max_nodes
+        self.nodes = 0
+        self.path = []
+        self.reach = 0
+
+    def dfs(self, state, sleep=0):
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            raise NodeLimit
+        depth = len(self.path)
+        if depth > self.reach:
+            self.reach = depth
+        if self.bb.is_solved(state, self.target):
+            return True
+
+        if self.visited is not None:
+            seen = self.visited.get(state)
+            if seen is not None:
+                # everything awake now was already explored last time
+                if not seen & ~sleep:
+                    return False
+                sleep &= seen
+            self.visited[state] = sleep
+
+        masks, indep = self.bb.masks, self.indep
+        done = 0
+        # reach: deepest depth seen so far, kept per subtree so the policy
+        # can be told which child got furthest
+        outer = self.reach
+        best, deepest = None, depth
+        for j in self.order.order(self.bb.moves(state), depth):
+            if sleep >> j & 1:
+                continue
+            self.path.append(j)
+            self.reach = depth + 1
+            if self.dfs(state ^ masks[j], (sleep | done) & indep[j]):
+                return True
+            self.path.pop()
+            if self.reach > deepest:
+                best, deepest = j, self.reach
+            done |= 1 << j
+        self.reach = max(outer, deepest)
+        if best is not None:
+            self.order.reward(best, depth, deepest)
+        return False
+
+    def solve(self, start):
+        """Return the jumps from `start` to a finish, or None -- also when
+        `max_nodes` runs out, which sets `capped`."""
+        self.path = []
+        self.reach = 0
+        self.capped = False
+        try:
+            if self.dfs(start):
+                return self.path
+        except NodeLimit:
+            self.capped = True
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("board", choices=["british", "european"])
+    parser.add_argument("--hole", default="3,3", help="starting vacancy as row,col")
+    parser.add_argument("--target", help="finishing cell as row,col")
+    parser.add_argument("--no-visited", action="store_true",
+                        help="keep no visited set, only the sleep sets")
+    parser.add_argument("--order", choices=POLICIES, default="scan",
+                        help="move ordering policy")
+    args = parser.parse_args()
+
+    sys.setrecursionlimit(10000)
+    bb = layout(args.board)
+    target = parse_cell(args.target) if args.target else None
+    solver = SleepDFS(bb, target, visited=not args.no_visited,
+                      order=policy(args.order, bb))
+    t0 = time.time()
+    jumps = solver.solve(bb.valid ^ (1 << parse_cell(args.hole)))
+    print("%d nodes, %.2fs" % (solver.nodes, time.time() - t0))
+    if jumps is None:
+        print("no solution")
+    else:
+        print([bb.to_move(j) for j in jumps])
+        print(len(jumps))
@@ -0,0 +1,134 @@
+"""
+Monte Carlo rollouts: quick statistics without a search.
+
+Plays batches of games at once as NumPy arrays of packed positions. Each step
+tests every game against every jump with the precomputed need/hole masks,
+picks one legal jump per game and applies it with a single XOR, so the only
+Python loop is over the (at most 35) jumps of a game, never over games.
+Games stop when they run out of jumps, and the pegs they leave give the
+distribution.
+
+Jumps are chosen uniformly, or weighted by a policy: one uniform draw per
+game is placed on the running sum of the weights of its legal jumps.
+
+    uniform  every legal jump equally likely
+    corner   jumps from further out more likely, like ordering.CornerFirst
+
+    python rollout.py british --games 1000000
+    python rollout.py european --hole 6,4 --moves
+"""
+import argparse
+import time
+
+import numpy as np
+
+from bitboard import N, coords, layout, parse_cell
+from packed import popcount
+
+
+def uniform(bb):
+    return np.ones(bb.njumps)
+
+
+def corner(bb):
+    mid = N // 2
+    return np.array([2.0 ** (abs(r - mid) + abs(c - mid))
+                     for r, c in map(coords, bb.src)])
+
+
+POLICIES = {"uniform": uniform, "corner": corner}
+
+
+class Stats:
+    """Pegs left over a set of games."""
+    def __init__(self, finals, wins):
+        self.games = len(finals)
+        self.histogram = np.bincount(finals, minlength=2)
+        self.mean = float(finals.mean()) if self.games else 0.0
+        self.wins = int(wins)
+
+    @property
+    def p_win(self):
+        return self.wins / self.games if self.games else 0.0
+
+    def __repr__(self):
+        return "%d games, mean %.2f pegs, P(win) %.4f" % (self.games, self.mean, self.p_win)
+
+
+class Rollouts:
+    def __init__(self, bb, target=None, policy="uniform", seed=None, batch=1 << 16):
+        self.bb = bb
+        self.target = target
+        self.batch = batch
+        self.rng = np.random.default_rng(seed)
+        self.need = np.array(bb.need, dtype=np.uint64)
+        self.hole = np.array(bb.hole, dtype=np.uint64)
+        self.masks = np.array(bb.masks, dtype=np.uint64)
+        self.weights = POLICIES[policy](bb)
+
+    def finish(self, states):
+        """Play every game in `states` (uint64, changed in place) until it
+        has no jump left."""
+        live = np.arange(len(states))
+        while len(live):
+            s = states[live, None]
+            legal = ((s & self.need) == self.need) & ((s & self.hole) == 0)
+            movable = legal.any(axis=1)
+            live, legal = live[movable], legal[movable]
+            if not len(live):
+                break
+            total = np.cumsum(np.where(legal, self.weights, 0.0), axis=1)
+            draw = self.rng.random(len(live)) * total[:, -1]
+            states[live] ^= self.masks[(total > draw[:, None]).argmax(axis=1)]
+        return states
+
+    def play(self, start, games):
+        """Stats over `games` rollouts from the packed position `start`."""
+        finals = []
+        wins = 0
+        for lo in range(0, games, self.batch):
+            states = self.finish(np.full(min(self.batch, games - lo), start, dtype=np.uint64))
+            left = popcount(states)
+            if self.target is None:
+                wins += np.count_nonzero(left == 1)
+            else:
+                wins += np.count_nonzero(states == np.uint64(1 << self.target))
+            finals.append(left.astype(np.int64))
+        return Stats(np.concatenate(finals) if finals else np.zeros(0, np.int64), wins)
+
+    def by_hole(self, games, holes=None):
+        """{start hole: Stats} for single-vacancy starts (default: every cell)."""
+        return {k: self.play(self.bb.valid ^ (1 << k), games)
+                for k in (holes or self.bb.cells)}
+
+    def by_move(self, state, games):
+        """{jump: Stats} for each jump legal from `state`, games per jump."""
+        return {j: self.play(state ^ self.bb.masks[j], games)
+                for j in self.bb.moves(state)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("board", choices=["british", "european"])
+    parser.add_argument("--hole", help="one start hole as row,col (default: every hole)")
+    parser.add_argument("--target", help="finishing cell as row,col")
+    parser.add_argument("--games", type=int, default=100_000, help="games per start")
+    parser.add_argument("--policy", choices=POLICIES, default="uniform")
+    parser.add_argument("--moves", action="store_true",
+                        help="per first jump from --hole instead of per hole")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    bb = layout(args.board)
+    target = parse_cell(args.target) if args.target else None
+    engine = Rollouts(bb, target, args.policy, args.seed)
+    t0 = time.perf_counter()
+    if args.moves:
+        start = bb.valid ^ (1 << parse_cell(args.hole or "3,3"))
+        for j, stats in engine.by_move(start, args.games).items():
+            print(bb.to_move(j), stats)
+    else:
+        holes = [parse_cell(args.hole)] if args.hole else None
+        for k, stats in engine.by_hole(args.games, holes).items():
+            print("%d,%d" % coords(k), stats, stats.histogram[1:].tolist())
+    print("%.2fs" % (time.perf_counter() - t0))
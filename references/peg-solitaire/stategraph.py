@@ -0,0 +1,234 @@
+"""
+Reachable-state graph on disk, as memory-mapped CSR arrays.
+
+The visualisers build a networkx.DiGraph, which is fine for a few thousand
+positions and hopeless for the 23 million (up to symmetry) reachable from the
+British centre. `export` writes the whole graph as flat .npy arrays instead:
+
+    states.npy      sorted packed positions (uint64); a position's id is its index
+    offsets.npy     children of id i are children[offsets[i]:offsets[i+1]]
+    children.npy    child ids (uint32), in jump-table order
+    in_offsets.npy  the reverse graph, same layout,
+    parents.npy     so parent queries are slices too
+    meta.json       board, start, and whether positions are reduced by symmetry
+
+`StateGraph` maps them back read-only, so queries touch only the pages they
+need. Distances to the nearest dead end (no jump left, more than one peg) are
+computed for every id at once by a breadth-first search backwards from all
+dead ends and cached in dead_distance.npy.
+
+    python stategraph.py export british --symmetric -o british.graph
+    python stategraph.py export european --hole 6,4 --symmetric -o euro.graph
+    python stategraph.py query british.graph --hole 3,3
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from bitboard import N, layout, parse_cell
+from packed import popcount
+
+CHUNK = 1 << 18
+
+
+class Jumps:
+    """The jump table and symmetry tables of a BitBoard as NumPy arrays."""
+    def __init__(self, bb, symmetric=False):
+        self.bb = bb
+        self.need = np.array(bb.need, dtype=np.uint64)
+        self.hole = np.array(bb.hole, dtype=np.uint64)
+        self.masks = np.array(bb.masks, dtype=np.uint64)
+        self.tables = np.array(bb.tables, dtype=np.uint64) if symmetric else None
+
+    def legal(self, states):
+        s = states[:, None]
+        return ((s & self.need) == self.need) & ((s & self.hole) == 0)
+
+    def canonical(self, states):
+        if self.tables is None:
+            return states
+        best = states.copy()
+        rows = [(states >> np.uint64(N * r)) & np.uint64(127) for r in range(N)]
+        for t in self.tables[1:]:
+            image = t[0][rows[0]]
+            for r in range(1, N):
+                image |= t[r][rows[r]]
+            np.minimum(best, image, out=best)
+        return best
+
+    def expand(self, states):
+        """(parent row, child position) for every jump from `states`."""
+        rows, js = np.nonzero(self.legal(states))
+        return rows, self.canonical(states[rows] ^ self.masks[js])
+
+
+def reachable(jumps, start, verbose=False):
+    """Every position reachable from `start`, sorted."""
+    layer = jumps.canonical(np.array([start], dtype=np.uint64))
+    layers = [layer]
+    while len(layer):
+        nxt = [np.unique(jumps.expand(layer[lo:lo + CHUNK])[1])
+               for lo in range(0, len(layer), CHUNK)]
+        layer = np.unique(np.concatenate(nxt))
+        if len(layer):
+            layers.append(layer)
+        if verbose:
+            print("layer %2d: %d positions" % (len(layers) - 1, len(layer)))
+    return np.sort(np.concatenate(layers))
+
+
+def gather(offsets, values, ids):
+    """values[offsets[i]:offsets[i+1]] for every i in `ids`, concatenated."""
+    starts = offsets[ids]
+    lengths = offsets[ids + 1] - starts
+    total = int(lengths.sum())
+    if not total:
+        return values[:0]
+    shift = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return values[shift + np.arange(total)]
+
+
+def export(board, start, path, symmetric=False, verbose=False):
+    jumps = Jumps(layout(board), symmetric)
+    t0 = time.time()
+    states = reachable(jumps, start, verbose)
+    n = len(states)
+    if verbose:
+        print("%d positions, %.1fs" % (n, time.time() - t0))
+
+    os.makedirs(path, exist_ok=True)
+    # pass one: out-degrees, so the child array can be written in place
+    degree = np.empty(n, dtype=np.uint32)
+    for lo in range(0, n, CHUNK):
+        degree[lo:lo + CHUNK] = jumps.legal(states[lo:lo + CHUNK]).sum(axis=1)
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(degree, out=offsets[1:])
+    edges = int(offsets[-1])
+
+    # pass two: child ids; with symmetry two jumps can give the same child,
+    # and both edges are kept so degrees still count jumps
+    children = np.lib.format.open_memmap(os.path.join(path, "children.npy"), "w+",
+                                         np.uint32, (edges,))
+    for lo in range(0, n, CHUNK):
+        _, child = jumps.expand(states[lo:lo + CHUNK])
+        children[offsets[lo]:offsets[min(lo + CHUNK, n)]] = np.searchsorted(states, child)
+    children.flush()
+
+    # the reverse graph: edges sorted by child id
+    in_degree = np.bincount(children, minlength=n)
+    in_offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(in_degree, out=in_offsets[1:])
+    order = np.argsort(children, kind="stable")
+    parents = np.repeat(np.arange(n, dtype=np.uint32), degree)[order]
+    del order
+
+    np.save(os.path.join(path, "states.npy"), states)
+    np.save(os.path.join(path, "offsets.npy"), offsets)
+    np.save(os.path.join(path, "in_offsets.npy"), in_offsets)
+    np.save(os.path.join(path, "parents.npy"), parents)
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump({"board": board, "start": start, "symmetric": symmetric,
+                   "positions": n, "edges": edges}, f)
+    if verbose:
+        print("%d edges, %.1fs" % (edges, time.time() - t0))
+
+
+class StateGraph:
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.bb = layout(self.meta["board"])
+        self.jumps = Jumps(self.bb, self.meta["symmetric"])
+        for name in ("states", "offsets", "children", "in_offsets", "parents"):
+            setattr(self, name, np.load(os.path.join(path, name + ".npy"), mmap_mode="r"))
+        self.dead = None
+
+    def __len__(self):
+        return len(self.states)
+
+    def id(self, state):
+        """Id of the packed position `state`, or None if it is not in the graph."""
+        key = self.jumps.canonical(np.array([state], dtype=np.uint64))[0]
+        i = int(np.searchsorted(self.states, key))
+        if i < len(self.states) and self.states[i] == key:
+            return i
+        return None
+
+    def out_degree(self, i):
+        return int(self.offsets[i + 1] - self.offsets[i])
+
+    def in_degree(self, i):
+        return int(self.in_offsets[i + 1] - self.in_offsets[i])
+
+    def child_ids(self, i):
+        return self.children[self.offsets[i]:self.offsets[i + 1]]
+
+    def parent_ids(self, i):
+        return self.parents[self.in_offsets[i]:self.in_offsets[i + 1]]
+
+    def dead_distances(self):
+        """Jumps from every id to its nearest dead end (-1: none reachable)."""
+        if self.dead is not None:
+            return self.dead
+        cache = os.path.join(self.path, "dead_distance.npy")
+        if os.path.exists(cache):
+            self.dead = np.load(cache, mmap_mode="r")
+            return self.dead
+
+        n = len(self.states)
+        dist = np.full(n, -1, dtype=np.int8)
+        frontier = []
+        for lo in range(0, n, CHUNK):
+            hi = min(lo + CHUNK, n)
+            stuck = self.offsets[lo + 1:hi + 1] == self.offsets[lo:hi]
+            stuck &= popcount(self.states[lo:hi]) > 1
+            frontier.append(lo + np.nonzero(stuck)[0])
+        frontier = np.concatenate(frontier)
+        d = 0
+        while len(frontier):
+            dist[frontier] = d
+            up = np.unique(gather(self.in_offsets, self.parents, frontier))
+            frontier = up[dist[up] < 0]
+            d += 1
+        np.save(cache, dist)
+        self.dead = dist
+        return dist
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    ex = sub.add_parser("export", help="write the graph of a board")
+    ex.add_argument("board", choices=["british", "european"])
+    ex.add_argument("--hole", default="3,3", help="starting vacancy as row,col")
+    ex.add_argument("--symmetric", action="store_true",
+                    help="one position per symmetry class")
+    ex.add_argument("-o", "--output", help="directory to write (default: <board>.graph)")
+    q = sub.add_parser("query", help="degrees, parents and dead-end distance of a position")
+    q.add_argument("graph")
+    q.add_argument("--hole", help="position with every peg but this one (default: the start)")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        bb = layout(args.board)
+        export(args.board, bb.valid ^ (1 << parse_cell(args.hole)),
+               args.output or args.board + ".graph", args.symmetric, verbose=True)
+    else:
+        g = StateGraph(args.graph)
+        state = g.meta["start"]
+        if args.hole:
+            state = g.bb.valid ^ (1 << parse_cell(args.hole))
+        i = g.id(state)
+        if i is None:
+            parser.error("position not in this graph")
+        t0 = time.time()
+        dist = g.dead_distances()
+        print("%d positions, %d edges" % (len(g), len(g.children)))
+        print("id %d: out-degree %d, in-degree %d, parents %s, %d jumps from a dead end (%.1fs)"
+              % (i, g.out_degree(i), g.in_degree(i), g.parent_ids(i)[:8].tolist(),
+                 dist[i], time.time() - t0))
+        print("children:", g.child_ids(i).tolist())
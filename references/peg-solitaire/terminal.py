@@ -0,0 +1,153 @@
+"""
+Curses front end for the single-player games (british/board.py,
+european/single-player.py).
+
+The old loop cleared the terminal with a shell `clear`, printed the whole
+board and rescanned all 49 cells for pegs and jumps after every keypress.
+Here the screen is drawn once; after that a keypress rewrites only the cells
+it changed (the cursor's old and new cell, and the three cells of a jump),
+and curses sends just those characters to the terminal. `Counts` keeps the
+peg count, the jumps from each cell and the packed position up to date from
+the three cells a jump touches, so win and loss checks are O(1).
+"""
+import asyncio
+import curses
+import sys
+
+from bitboard import index
+
+N = 7
+DIRECTIONS = {"w": (-1, 0), "a": (0, -1), "s": (1, 0), "d": (0, 1)}
+# cells within two steps in a line: the only ones whose jumps a changed cell affects
+REACH = [(0, 0)] + [(dr * k, dc * k) for dr, dc in DIRECTIONS.values() for k in (1, 2)]
+
+
+def jump_cells(position, direction):
+    """The cells a jump from `position` touches: from, over and to."""
+    (r, c), (dr, dc) = position, DIRECTIONS[direction]
+    return [(r, c), (r + dr, c + dc), (r + 2 * dr, c + 2 * dc)]
+
+
+class Counts:
+    """Pegs, movable pegs and the packed position of a 2D board (>0 a peg,
+    <0 a hole, 0 off the board), kept current one jump at a time."""
+    def __init__(self, board):
+        self.board = board
+        self.jumps = [[0] * N for _ in range(N)]
+        self.pegs = 0
+        self.valids = 0   # pegs with at least one jump, as check_loss counted them
+        self.state = 0
+        for r in range(N):
+            for c in range(N):
+                if board[r][c] > 0:
+                    self.pegs += 1
+                    self.state |= 1 << index(r, c)
+                self.rescore(r, c)
+
+    def peg(self, r, c):
+        return 0 <= r < N and 0 <= c < N and self.board[r][c] > 0
+
+    def hole(self, r, c):
+        return 0 <= r < N and 0 <= c < N and self.board[r][c] < 0
+
+    def rescore(self, r, c):
+        before = self.jumps[r][c]
+        n = 0
+        if self.board[r][c] > 0:
+            for dr, dc in DIRECTIONS.values():
+                if self.peg(r + dr, c + dc) and self.hole(r + 2 * dr, c + 2 * dc):
+                    n += 1
+        self.jumps[r][c] = n
+        self.valids += (n > 0) - (before > 0)
+
+    def jumped(self, cells):
+        """Account for a jump already made on the board over `cells`."""
+        self.pegs -= 1
+        for r, c in cells:
+            self.state ^= 1 << index(r, c)
+        near = {(r + dr, c + dc) for r, c in cells for dr, dc in REACH}
+        for r, c in near:
+            if 0 <= r < N and 0 <= c < N:
+                self.rescore(r, c)
+
+
+class Screen:
+    """The board at the top of a curses window, status lines under it."""
+    def __init__(self, stdscr, board):
+        self.scr = stdscr
+        self.board = board
+        self.lines = []
+        curses.curs_set(0)
+        self.scr.clear()
+
+    def glyph(self, r, c, cursor):
+        if [r, c] == cursor:
+            return 'X'
+        cell = self.board[r][c]
+        return '.' if cell > 0 else ' ' if cell == 0 else 'O'
+
+    def draw(self, cursor):
+        for r in range(N):
+            for c in range(N):
+                self.cell(r, c, cursor)
+
+    def cell(self, r, c, cursor):
+        # rows are spaced out like the print()ed board was
+        self.scr.addch(2 * r, c, self.glyph(r, c, cursor))
+
+    def cells(self, cells, cursor):
+        for r, c in cells:
+            if 0 <= r < N and 0 <= c < N:
+                self.cell(r, c, cursor)
+
+    def status(self, lines):
+        """Rewrite the status lines that differ from the ones on screen."""
+        top = 2 * N
+        for i in range(max(len(lines), len(self.lines))):
+            line = lines[i] if i < len(lines) else ""
+            if i >= len(self.lines) or self.lines[i] != line:
+                self.scr.move(top + i, 0)
+                self.scr.clrtoeol()
+                self.scr.addnstr(top + i, 0, line, curses.COLS - 1)
+        self.lines = list(lines)
+
+    def show(self, lines):
+        """status(), sent to the terminal now rather than at the next
+        prompt: for lines that change while the game waits on a key."""
+        self.status(lines)
+        self.scr.refresh()
+
+    def ask(self, prompt):
+        self.scr.move(2 * N - 1, 0)
+        self.scr.clrtoeol()
+        self.scr.addstr(2 * N - 1, 0, prompt)
+        self.scr.refresh()
+
+    def key(self, prompt="move: "):
+        """One keypress, as a string, asked for on the line under the board."""
+        self.ask(prompt)
+        ch = self.scr.get_wch()
+        return ch if isinstance(ch, str) else ""
+
+    async def key_async(self, prompt="move: "):
+        """key(), waiting on the event loop so other tasks run meanwhile."""
+        self.ask(prompt)
+        loop = asyncio.get_running_loop()
+        fd = sys.stdin.fileno()
+        while True:
+            # curses may already hold typed-ahead keys that stdin no longer shows
+            self.scr.nodelay(True)
+            try:
+                ch = self.scr.get_wch()
+            except curses.error:
+                ch = None
+            finally:
+                self.scr.nodelay(False)
+            if ch is not None:
+                return ch if isinstance(ch, str) else ""
+            ready = loop.create_future()
+            loop.add_reader(fd, lambda: ready.done() or ready.set_result(None))
+            try:
+                await ready
+            finally:
+                loop.remove_reader(fd)
@@ -1,10 +1,6 @@
-import copy
-import hashlib
-import networkx as nx
-import matplotlib.pyplot as plt
-import imageio
-import os
-from networkx.drawing.nx_agraph import graphviz_layout  # requires pygraphviz
+import argparse
+
+from solver import PegSolitaire
 
 ######################################
 #  Visualization Helper Code
@@ -12,227 +8,33 @@ from networkx.drawing.nx_agraph import graphviz_layout  # requires pygraphviz
 
 class DFSVisualizer:
     def __init__(self):
+        # networkx (and, in build_gif, graphviz and matplotlib) is imported here
+        # rather than at the top, so importing this file for the solver alone
+        # costs no more than the standard library.
+        import networkx as nx
         self.G = nx.DiGraph()
-        self.frames = []
+        self.events = []   # (highlighted edge, title) for every step, in order
+        self.root = None
         self.step_count = 0
 
     def record_step(self, root_node, highlight_edge=None, title=""):
-        """Draw the current graph using a top-down layout and save as a PNG frame."""
+        """Record a search step. Frames are drawn after the search, in render()."""
         self.step_count += 1
-        fig, ax = plt.subplots(figsize=(8, 6))
-
+        self.root = root_node
+        self.events.append((highlight_edge, f"{title} (Step {self.step_count})"))
+
+    def build_gif(self, gif_name="dfs_traversal.gif", fps=1, workers=None):
+        """Compute one top-down layout of the final graph, render the frame of each
+        recorded step in a pool of `workers` processes (one per CPU by default) and
+        stream the frames in order into the GIF, or an MP4 if the name ends in .mp4."""
+        from networkx.drawing.nx_agraph import graphviz_layout  # requires pygraphviz
+        from frames import Scene, write_animation
         # Use Graphviz for a top-down hierarchical layout; ensure the root exists in the graph.
-        pos = graphviz_layout(self.G, prog='dot', root=root_node)
-
-        # Draw edges and nodes.
-        nx.draw_networkx_edges(self.G, pos, ax=ax, arrowstyle='->', arrowsize=10)
-        nx.draw_networkx_nodes(self.G, pos, ax=ax, node_size=500, node_color='lightblue')
-        
-        # Optionally, highlight a specific edge in red.
-        if highlight_edge and highlight_edge in self.G.edges:
-            nx.draw_networkx_edges(
-                self.G, pos, ax=ax,
-                edgelist=[highlight_edge],
-                edge_color='red', width=2, arrowstyle='->', arrowsize=12
-            )
-
-        plt.title(f"{title} (Step {self.step_count})")
-        plt.axis("off")
-
-        filename = f"dfs_step_{self.step_count:03d}.png"
-        plt.savefig(filename, dpi=150)
-        plt.close(fig)
-        self.frames.append(filename)
-
-    def build_gif(self, gif_name="dfs_traversal.gif", fps=1):
-        """Combine saved PNG frames into an animated GIF and clean up the PNG files."""
-        with imageio.get_writer(gif_name, mode='I', fps=fps) as writer:
-            for frame_path in self.frames:
-                image = imageio.imread(frame_path)
-                writer.append_data(image)
-        for frame_path in self.frames:
-            os.remove(frame_path)
+        pos = graphviz_layout(self.G, prog='dot', root=self.root)
+        scene = Scene(pos, self.root, self.events)
+        write_animation(gif_name, scene, fps, workers)
         print(f"GIF saved to {gif_name}")
 
-######################################
-#  Helper Functions for Board Encoding
-######################################
-
-def board_to_str(board):
-    """Convert the board to a multi-line string for node labels."""
-    rows = []
-    for row in board:
-        row_str = []
-        for cell in row:
-            if cell < 0:
-                row_str.append('O')  # an empty spot
-            elif cell == 0:
-                row_str.append(' ')  # a cell that is not part of the board
-            else:
-                row_str.append('.')  # a peg
-        rows.append("".join(row_str))
-    return "\n".join(rows)
-
-def make_node_id(board):
-    """Generate a short unique ID based on the board state."""
-    flat_str = "".join(str(x) for row in board for x in row)
-    short_hash = hashlib.md5(flat_str.encode()).hexdigest()[:8]
-    return f"node_{short_hash}"
-
-######################################
-#  PegSolitaire with DFS Visualization
-######################################
-
-N = 7  # board size
-
-class PegSolitaire:
-    def __init__(self, board, visualizer=None):
-        # The board is a 2D list.
-        self.board = board
-        self.vis = visualizer
-        self.visited = set()  # used to prevent re-visiting the same board state
-        self.moves = []       # to store moves (if you want to print them later)
-    
-    def is_solved(self):
-        pegs = 0
-        position = []
-        for i, row in enumerate(self.board):
-            for j, cell in enumerate(row):
-                if cell > 0:
-                    position.append([i, j])
-                    pegs += 1
-                # Early exit if more than one peg exists.
-                if pegs > 1:
-                    return False
-        # You can enforce a specific end location by checking `position == [[3,3]]`
-        # For now, we return True if exactly one peg remains.
-        return pegs == 1
-
-    def get_valid_moves(self):
-        """
-        Check every cell for a peg and if it can jump over an adjacent peg
-        into an empty space (represented by -1). Moves are returned as lists:
-        [row, col, direction, jumped_value]
-        where direction is 'w' (up), 'a' (left), 's' (down), or 'd' (right).
-        """
-        valid_moves = []
-        for i, row in enumerate(self.board):
-            for j, cell in enumerate(row):
-                if cell > 0:  # found a peg
-                    # Up
-                    if i > 1 and self.board[i-2][j] < 0 and self.board[i-1][j] > 0:
-                        valid_moves.append([i, j, "w", self.board[i-1][j]])
-                    # Left
-                    if j > 1 and self.board[i][j-2] < 0 and self.board[i][j-1] > 0:
-                        valid_moves.append([i, j, "a", self.board[i][j-1]])
-                    # Down
-                    if i < N-2 and self.board[i+2][j] < 0 and self.board[i+1][j] > 0:
-                        valid_moves.append([i, j, "s", self.board[i+1][j]])
-                    # Right
-                    if j < N-2 and self.board[i][j+2] < 0 and self.board[i][j+1] > 0:
-                        valid_moves.append([i, j, "d", self.board[i][j+1]])
-        return valid_moves
-
-    def make_move(self, move):
-        """
-        Execute a move. The move is a list: [i, j, direction, jumped_value].
-        After making the move, update the board and modify the move's position to reflect
-        the new peg position.
-        """
-        self.moves.append(move)
-        i, j, direction, jumped_value = move
-        if direction == "w":
-            self.board[i-1][j] = -1
-            self.board[i-2][j] = self.board[i][j]
-            self.board[i][j] = -1
-            move[0] = i-2  # update row position
-        elif direction == "a":
-            self.board[i][j-1] = -1
-            self.board[i][j-2] = self.board[i][j]
-            self.board[i][j] = -1
-            move[1] = j-2  # update column position
-        elif direction == "s":
-            self.board[i+1][j] = -1
-            self.board[i+2][j] = self.board[i][j]
-            self.board[i][j] = -1
-            move[0] = i+2
-        elif direction == "d":
-            self.board[i][j+1] = -1
-            self.board[i][j+2] = self.board[i][j]
-            self.board[i][j] = -1
-            move[1] = j+2
-
-    def undo_move(self):
-        """
-        Undo the last move. The move contains the original position,
-        the direction, and the value of the jumped peg.
-        """
-        move = self.moves.pop()
-        i, j, direction, jumped_value = move
-        if direction == "w":
-            self.board[i+2][j] = self.board[i][j]
-            self.board[i][j] = -1
-            self.board[i+1][j] = jumped_value
-        elif direction == "a":
-            self.board[i][j+2] = self.board[i][j]
-            self.board[i][j] = -1
-            self.board[i][j+1] = jumped_value
-        elif direction == "s":
-            self.board[i-2][j] = self.board[i][j]
-            self.board[i][j] = -1
-            self.board[i-1][j] = jumped_value
-        elif direction == "d":
-            self.board[i][j-2] = self.board[i][j]
-            self.board[i][j] = -1
-            self.board[i][j-1] = jumped_value
-
-    def solve_dfs(self, depth=0, max_depth=4):
-        """
-        Depth-limited DFS that builds a visualization graph.
-        The search will expand up to `max_depth` levels deep.
-        """
-        board_str = board_to_str(self.board)      # multi-line string label for display
-        node_id = make_node_id(self.board)          # unique node identifier
-
-        if node_id in self.visited:
-            return False
-        self.visited.add(node_id)
-
-        # Add the current board state as a node in the graph.
-        if self.vis is not None:
-            self.vis.G.add_node(node_id, label=board_str)
-
-        if depth == 0:
-            self.root_id = node_id  # store the root id for the layout
-
-        if self.is_solved():
-            print("Solution found!")
-            return True
-
-        if depth >= max_depth:
-            return False
-
-        for move in self.get_valid_moves():
-            self.make_move(move)
-            child_str = board_to_str(self.board)
-            child_id = make_node_id(self.board)
-
-            if self.vis is not None:
-                self.vis.G.add_node(child_id, label=child_str)
-                self.vis.G.add_edge(node_id, child_id)
-                self.vis.record_step(
-                    root_node=self.root_id,
-                    highlight_edge=(node_id, child_id),
-                    title=f"Depth {depth} -> {depth+1}"
-                )
-            
-            if self.solve_dfs(depth + 1, max_depth):
-                return True
-
-            self.undo_move()  # Backtrack
-
-        return False
-
 ##########################################
 #  Main: Set up the Board, Run DFS, Build GIF
 ##########################################
@@ -252,18 +54,32 @@ if __name__ == "__main__":
         [ 0,  0, 34, 35, 36,  0,  0]
     ]
 
-    # Create the visualizer.
-    viz = DFSVisualizer()
-
-    # Create the game instance with the board and visualizer.
-    game = PegSolitaire(board, visualizer=viz)
-    
-    # Run the DFS with a maximum depth of 4.
-    solved = game.solve_dfs(depth=0, max_depth=3)
-    if solved:
-        print("A solution was found within 4 levels of depth!")
+    parser = argparse.ArgumentParser(description="Depth-limited DFS of the European board, as a GIF or a replayable trace.")
+    parser.add_argument("--max-depth", type=int, default=3)
+    parser.add_argument("--trace", help="write the search events to this file for the browser instead of a GIF")
+    args = parser.parse_args()
+
+    if args.trace:
+        # Record the search without a visualizer, so none of the drawing stack is imported.
+        from searchtrace import TraceRecorder
+        recorder = TraceRecorder(board)
+        game = PegSolitaire(board, trace=recorder)
+        game.solve_dfs(depth=0, max_depth=args.max_depth)
+        recorder.save(args.trace)
+        print(f"{len(recorder)} events saved to {args.trace}")
     else:
-        print("No solution was found within the depth limit.")
+        # Create the visualizer.
+        viz = DFSVisualizer()
+
+        # Create the game instance with the board and visualizer.
+        game = PegSolitaire(board, visualizer=viz)
+
+        # Run the DFS up to the depth limit.
+        solved = game.solve_dfs(depth=0, max_depth=args.max_depth)
+        if solved:
+            print(f"A solution was found within {args.max_depth} levels of depth!")
+        else:
+            print("No solution was found within the depth limit.")
 
-    # Build the GIF showing the DFS traversal.
-    viz.build_gif("dfs_traversal_4_levels.gif", fps=1)
+        # Build the GIF showing the DFS traversal.
+        viz.build_gif("dfs_traversal_4_levels.gif", fps=1)
@@ -0,0 +1,186 @@
+"""
+Frame rendering for the DFS visualisers (vis.py, euro-vis.py).
+
+A frame is a pure function of its step number: every node and edge is drawn
+once on a single figure and a frame only switches on the ones that had
+appeared by then, so frames can be drawn in any process and in any order.
+`render_frames` rasterises them in a process pool straight to in-memory
+buffers and yields them back in step order; `write_animation` feeds them to
+the encoder with no files in between. Agg rendering is deterministic and GIF
+frames are mapped onto a fixed palette (not a per-frame quantiser), so the
+output is byte-identical whatever the number of workers.
+"""
+import multiprocessing
+
+import imageio
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgb, to_rgba
+from PIL import Image
+
+NEVER = np.iinfo(np.int64).max
+
+
+def fixed_palette():
+    """256 colours: white shading into each colour the frames use, and those
+    colours into each other, so antialiased pixels map without dithering."""
+    white, blue, black, red = (np.array(to_rgb(c)) for c in ('white', 'lightblue', 'black', 'red'))
+    ramps = [(white, blue, 64), (white, black, 64), (white, red, 64),
+             (blue, black, 32), (blue, red, 32)]
+    colours = [a + (b - a) * t for a, b, n in ramps for t in np.linspace(0, 1, n)]
+    return np.round(np.array(colours) * 255).astype(np.uint8)
+
+
+PALETTE = fixed_palette()
+
+
+class Scene:
+    """Everything needed to draw any frame: the final layout, the step at
+    which each node and edge first appears, and the per-step highlights."""
+    def __init__(self, pos, root, events):
+        self.nodes = list(pos)
+        node_at = {n: i for i, n in enumerate(self.nodes)}
+        self.xy = np.array([pos[n] for n in self.nodes], dtype=float)
+        self.node_first = np.full(len(self.nodes), NEVER)
+        if root in node_at:
+            self.node_first[node_at[root]] = 0
+
+        self.edges = []
+        edge_at = {}
+        self.highlights = []
+        self.titles = []
+        for step, (edge, title) in enumerate(events, 1):
+            if edge is not None and edge[0] in node_at and edge[1] in node_at:
+                if edge not in edge_at:
+                    edge_at[edge] = len(self.edges)
+                    self.edges.append((edge, step))
+                for n in edge:
+                    self.node_first[node_at[n]] = min(self.node_first[node_at[n]], step)
+                self.highlights.append((pos[edge[0]], pos[edge[1]]))
+            else:
+                self.highlights.append(None)
+            self.titles.append(title)
+        self.segments = [(pos[u], pos[v]) for (u, v), _ in self.edges]
+        self.edge_first = np.array([step for _, step in self.edges], dtype=np.int64)
+
+    def __len__(self):
+        return len(self.titles)
+
+
+class FrameRenderer:
+    """One figure per process, redrawn for each requested step."""
+    def __init__(self, scene, size=(8, 6), dpi=150):
+        self.scene = scene
+        self.fig, self.ax = plt.subplots(figsize=size, dpi=dpi)
+        self.ax.axis("off")
+        self.node_rgba = np.tile(to_rgba('lightblue'), (len(scene.nodes), 1))
+        self.edge_rgba = np.tile(to_rgba('black'), (len(scene.segments), 1))
+        self.lines = LineCollection(scene.segments, colors=self.edge_rgba,
+                                    linewidths=1, zorder=1)
+        self.ax.add_collection(self.lines)
+        self.dots = self.ax.scatter(scene.xy[:, 0], scene.xy[:, 1], s=500,
+                                    c=self.node_rgba, zorder=2)
+        self.highlight, = self.ax.plot([], [], color='red', linewidth=2, zorder=3)
+        self.ax.autoscale_view()
+
+    def draw(self, step):
+        """RGB pixels of the graph as it stood after `step` (1-based)."""
+        scene = self.scene
+        self.node_rgba[:, 3] = scene.node_first <= step
+        self.edge_rgba[:, 3] = scene.edge_first <= step
+        self.dots.set_facecolor(self.node_rgba)
+        self.lines.set_color(self.edge_rgba)
+        edge = scene.highlights[step - 1]
+        if edge is None:
+            self.highlight.set_data([], [])
+        else:
+            self.highlight.set_data(*zip(*edge))
+        self.ax.set_title(scene.titles[step - 1])
+        self.fig.canvas.draw()
+        return np.asarray(self.fig.canvas.buffer_rgba())[..., :3].copy()
+
+
+# the renderer of a worker process, built once by _start
+_renderer = None
+
+
+def _start(scene):
+    global _renderer
+    _renderer = FrameRenderer(scene)
+
+
+# palette index of every 24-bit colour met so far in this process, -1 if not yet
+_nearest = None
+
+
+def paletted(rgb):
+    """Indices into PALETTE of the nearest colour to each pixel. Pillow's
+    quantize() only approximates the nearest entry; the frames use few
+    distinct colours, so each is matched exactly once and then looked up."""
+    global _nearest
+    if _nearest is None:
+        _nearest = np.full(1 << 24, -1, dtype=np.int16)
+    packed = (rgb[..., 0].astype(np.uint32) << 16) | (rgb[..., 1].astype(np.uint32) << 8) | rgb[..., 2]
+    index = _nearest[packed]
+    if (index < 0).any():
+        new = np.unique(packed[index < 0])
+        rgbs = np.stack([new >> 16, new >> 8 & 255, new & 255], axis=1).astype(np.int32)
+        _nearest[new] = ((rgbs[:, None, :] - PALETTE[None, :, :].astype(np.int32)) ** 2).sum(axis=2).argmin(axis=1)
+        index = _nearest[packed]
+    return index.astype(np.uint8)
+
+
+def _draw(step):
+    return _renderer.draw(step)
+
+
+def _draw_paletted(step):
+    return paletted(_renderer.draw(step)).tobytes()
+
+
+def render_frames(scene, workers=None, paletted_frames=False, chunksize=4):
+    """Yield every step's frame in order: RGB arrays, or the raw bytes of
+    palette images when `paletted_frames` is set (smaller to pass between
+    processes, and the GIF encoder's work done in the pool). workers=1
+    renders in this process; None uses one worker per CPU."""
+    steps = range(1, len(scene) + 1)
+    draw = _draw_paletted if paletted_frames else _draw
+    if workers == 1:
+        _start(scene)
+        for step in steps:
+            yield draw(step)
+        plt.close(_renderer.fig)
+        return
+    with multiprocessing.Pool(workers, initializer=_start, initargs=(scene,)) as pool:
+        yield from pool.imap(draw, steps, chunksize)
+
+
+def frame_size(size=(8, 6), dpi=150):
+    return round(size[0] * dpi), round(size[1] * dpi)
+
+
+def write_animation(path, scene, fps=1, workers=None):
+    """Render and encode every frame of `scene` to `path`: a GIF, or any
+    format imageio can stream (MP4 needs the imageio-ffmpeg plugin)."""
+    if not path.lower().endswith('.gif'):
+        with imageio.get_writer(path, mode='I', fps=fps) as writer:
+            for frame in render_frames(scene, workers):
+                writer.append_data(frame)
+        return
+
+    size = frame_size()
+
+    def image(data):
+        frame = Image.frombytes('P', size, data)
+        frame.putpalette(PALETTE.tobytes())
+        return frame
+
+    frames = (image(data) for data in render_frames(scene, workers, paletted_frames=True))
+    first = next(frames, None)
+    if first is None:
+        return
+    first.save(path, save_all=True, append_images=frames,
+               duration=1000 / fps, loop=0)
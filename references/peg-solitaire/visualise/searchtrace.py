@@ -0,0 +1,180 @@
+"""
+Search traces in a compact binary file the browser can replay.
+
+Instead of rendering a GIF on the server, a TraceRecorder attached to
+PegSolitaire writes down every search event and saves them as columns:
+
+    header   magic b"PEGT", version, board (0 british, 1 european),
+             start position (bit r*7+c set for a peg), event count
+    types    one byte per event: ROOT, VISIT, REVISIT, BACKTRACK, SOLVED
+    moves    one byte per event: (r*7+c)*4 + direction (w, a, s, d) of the
+             jump from parent to node, NO_MOVE for ROOT and SOLVED
+    nodes    uint32 byte length, then the node ids as zigzag varints of the
+             difference from the previous event's node
+    parents  likewise, differenced against the previous event's parent
+
+Node ids are numbered in order of first sight, so a new node is +1 from the
+last new one and siblings share a parent: most deltas fit in one byte and a
+100k-event trace comes to about 430 KB (160 KB gzipped). A VISIT moves the
+cursor along a jump to a new node, a REVISIT only touches a node already
+seen, and a BACKTRACK undoes the jump from parent to node. decodeTrace in
+the frontend's pegSolitaireLogic.js reads the same layout.
+
+    python vis.py --max-depth 5 --trace british.ptrace
+    python searchtrace.py british.ptrace
+"""
+import argparse
+import struct
+
+MAGIC = b"PEGT"
+VERSION = 1
+# magic, version, board, start position, events
+HEADER = struct.Struct("<4sBB2xQI")
+LENGTH = struct.Struct("<I")
+
+ROOT, VISIT, REVISIT, BACKTRACK, SOLVED = range(5)
+EVENTS = ["root", "visit", "revisit", "backtrack", "solved"]
+NO_MOVE = 255
+DIRECTIONS = "wasd"
+BOARDS = ["british", "european"]
+
+
+def pack_board(board):
+    """Pegs of a 2D board (positive cells) as bits r*7+c."""
+    return sum(1 << (i * len(row) + j)
+               for i, row in enumerate(board) for j, cell in enumerate(row) if cell > 0)
+
+
+def board_name(board):
+    return "british" if sum(cell != 0 for row in board for cell in row) == 33 else "european"
+
+
+def encode_move(i, j, direction):
+    return (i * 7 + j) * 4 + DIRECTIONS.index(direction)
+
+
+def decode_move(code):
+    cell, d = divmod(code, 4)
+    return cell // 7, cell % 7, DIRECTIONS[d]
+
+
+def zigzag(n):
+    return n << 1 if n >= 0 else (-n << 1) - 1
+
+
+def unzigzag(v):
+    return v >> 1 if not v & 1 else -((v + 1) >> 1)
+
+
+def write_deltas(values):
+    out = bytearray()
+    prev = 0
+    for v in values:
+        z = zigzag(v - prev)
+        prev = v
+        while z > 0x7F:
+            out.append(z & 0x7F | 0x80)
+            z >>= 7
+        out.append(z)
+    return LENGTH.pack(len(out)) + out
+
+
+def read_deltas(data, pos, count):
+    """(values, position after the column)"""
+    (length,) = LENGTH.unpack_from(data, pos)
+    pos += LENGTH.size
+    end = pos + length
+    values = []
+    prev = 0
+    while pos < end:
+        z = shift = 0
+        while True:
+            byte = data[pos]
+            pos += 1
+            z |= (byte & 0x7F) << shift
+            shift += 7
+            if byte < 0x80:
+                break
+        prev += unzigzag(z)
+        values.append(prev)
+    if len(values) != count:
+        raise ValueError("trace column holds %d values, expected %d" % (len(values), count))
+    return values, end
+
+
+class TraceRecorder:
+    """Collects the events of a search over one starting board."""
+    def __init__(self, board):
+        self.board = board_name(board)
+        self.start = pack_board(board)
+        self.ids = {}
+        self.types = bytearray()
+        self.moves = bytearray()
+        self.nodes = []
+        self.parents = []
+
+    def __len__(self):
+        return len(self.types)
+
+    def node(self, key):
+        """Small integer id of the solver's node key, numbered on first sight."""
+        return self.ids.setdefault(key, len(self.ids))
+
+    def record(self, kind, key, parent=None, move=NO_MOVE):
+        node = self.node(key)
+        self.types.append(kind)
+        self.moves.append(move)
+        self.nodes.append(node)
+        self.parents.append(node if parent is None else self.node(parent))
+
+    def root(self, key):
+        self.record(ROOT, key)
+
+    def solved(self, key):
+        self.record(SOLVED, key)
+
+    def jump(self, parent, key, jump, seen):
+        """The jump (row, col, direction) from `parent` led to `key`."""
+        self.record(REVISIT if seen else VISIT, key, parent, encode_move(*jump))
+
+    def backtrack(self, parent, key, jump):
+        self.record(BACKTRACK, key, parent, encode_move(*jump))
+
+    def to_bytes(self):
+        return (HEADER.pack(MAGIC, VERSION, BOARDS.index(self.board), self.start, len(self))
+                + bytes(self.types) + bytes(self.moves)
+                + write_deltas(self.nodes) + write_deltas(self.parents))
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+
+def read_trace(path):
+    """(board, start, types, moves, nodes, parents) of a trace file."""
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, board, start, count = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("%s is not a version %d search trace" % (path, VERSION))
+    pos = HEADER.size
+    types = data[pos:pos + count]
+    moves = data[pos + count:pos + 2 * count]
+    nodes, pos = read_deltas(data, pos + 2 * count, count)
+    parents, pos = read_deltas(data, pos, count)
+    return BOARDS[board], start, types, moves, nodes, parents
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("trace")
+    parser.add_argument("--head", type=int, default=10, help="events to list")
+    args = parser.parse_args()
+
+    board, start, types, moves, nodes, parents = read_trace(args.trace)
+    counts = {name: types.count(kind) for kind, name in enumerate(EVENTS)}
+    print("%s, %d pegs, %d events, %d nodes" % (board, start.bit_count(), len(types),
+                                               max(nodes, default=-1) + 1))
+    print(", ".join("%d %s" % (n, name) for name, n in counts.items()))
+    for t, m, n, p in list(zip(types, moves, nodes, parents))[:args.head]:
+        print("%-9s %6d <- %-6d %s" % (EVENTS[t], n, p, "" if m == NO_MOVE else decode_move(m)))
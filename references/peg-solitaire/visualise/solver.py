@@ -0,0 +1,197 @@
+"""
+The depth-limited DFS behind vis.py and euro-vis.py, without the visualiser.
+
+Only the standard library is imported here, so solver workers start as fast
+and as small as a bare interpreter; networkx, graphviz and matplotlib load
+only when a DFSVisualizer is created and attached. A searchtrace.TraceRecorder can
+be attached as well (or instead) to save the search for the browser.
+"""
+import hashlib
+
+EMPTY = -1
+N = 7  # board size
+
+######################################
+#  Helper Functions for Board Encoding
+######################################
+
+def board_to_str(board):
+    """Convert the board to a multi-line string for node labels."""
+    rows = []
+    for row in board:
+        row_str = []
+        for cell in row:
+            if cell < 0:
+                row_str.append('O')  # an empty spot
+            elif cell == 0:
+                row_str.append(' ')  # a cell that is not part of the board
+            else:
+                row_str.append('.')  # a peg
+        rows.append("".join(row_str))
+    return "\n".join(rows)
+
+def make_node_id(board):
+    """Generate a short unique ID based on the board state."""
+    flat_str = "".join(str(x) for row in board for x in row)
+    short_hash = hashlib.md5(flat_str.encode()).hexdigest()[:8]
+    return f"node_{short_hash}"
+
+######################################
+#  PegSolitaire with Depth-Limited DFS
+######################################
+
+class PegSolitaire:
+    def __init__(self, board, visualizer=None, target=None, trace=None):
+        # The board is a 2D list; `target` is the (row, col) the last peg
+        # must finish on, or None for anywhere.
+        self.board = board
+        self.vis = visualizer
+        self.trace = trace
+        self.target = target
+        self.visited = set()  # used to prevent re-visiting the same board state
+        self.moves = []       # to store moves (if you want to print them later)
+
+    def is_solved(self):
+        pegs = 0
+        position = None
+        for i, row in enumerate(self.board):
+            for j, cell in enumerate(row):
+                if cell > 0:
+                    position = (i, j)
+                    pegs += 1
+                # Early exit if more than one peg exists.
+                if pegs > 1:
+                    return False
+        return pegs == 1 and (self.target is None or position == tuple(self.target))
+
+    def get_valid_moves(self):
+        """
+        Check every cell for a peg and if it can jump over an adjacent peg
+        into an empty space (represented by -1). Moves are returned as lists:
+        [row, col, direction, jumped_value]
+        where direction is 'w' (up), 'a' (left), 's' (down), or 'd' (right).
+        """
+        valid_moves = []
+        for i, row in enumerate(self.board):
+            for j, cell in enumerate(row):
+                if cell > 0:  # found a peg
+                    # Up
+                    if i > 1 and self.board[i-2][j] < 0 and self.board[i-1][j] > 0:
+                        valid_moves.append([i, j, "w", self.board[i-1][j]])
+                    # Left
+                    if j > 1 and self.board[i][j-2] < 0 and self.board[i][j-1] > 0:
+                        valid_moves.append([i, j, "a", self.board[i][j-1]])
+                    # Down
+                    if i < N-2 and self.board[i+2][j] < 0 and self.board[i+1][j] > 0:
+                        valid_moves.append([i, j, "s", self.board[i+1][j]])
+                    # Right
+                    if j < N-2 and self.board[i][j+2] < 0 and self.board[i][j+1] > 0:
+                        valid_moves.append([i, j, "d", self.board[i][j+1]])
+        return valid_moves
+
+    def make_move(self, move):
+        """
+        Execute a move. The move is a list: [i, j, direction, jumped_value].
+        After making the move, update the board and modify the move's position to reflect
+        the new peg position.
+        """
+        self.moves.append(move)
+        i, j, direction, jumped_value = move
+        if direction == "w":
+            self.board[i-1][j] = EMPTY
+            self.board[i-2][j] = self.board[i][j]
+            self.board[i][j] = EMPTY
+            move[0] = i-2  # update row position
+        elif direction == "a":
+            self.board[i][j-1] = EMPTY
+            self.board[i][j-2] = self.board[i][j]
+            self.board[i][j] = EMPTY
+            move[1] = j-2  # update column position
+        elif direction == "s":
+            self.board[i+1][j] = EMPTY
+            self.board[i+2][j] = self.board[i][j]
+            self.board[i][j] = EMPTY
+            move[0] = i+2
+        elif direction == "d":
+            self.board[i][j+1] = EMPTY
+            self.board[i][j+2] = self.board[i][j]
+            self.board[i][j] = EMPTY
+            move[1] = j+2
+
+    def undo_move(self):
+        """
+        Undo the last move. The move contains the original position,
+        the direction, and the value of the jumped peg.
+        """
+        move = self.moves.pop()
+        i, j, direction, jumped_value = move
+        if direction == "w":
+            self.board[i+2][j] = self.board[i][j]
+            self.board[i][j] = EMPTY
+            self.board[i+1][j] = jumped_value
+        elif direction == "a":
+            self.board[i][j+2] = self.board[i][j]
+            self.board[i][j] = EMPTY
+            self.board[i][j+1] = jumped_value
+        elif direction == "s":
+            self.board[i-2][j] = self.board[i][j]
+            self.board[i][j] = EMPTY
+            self.board[i-1][j] = jumped_value
+        elif direction == "d":
+            self.board[i][j-2] = self.board[i][j]
+            self.board[i][j] = EMPTY
+            self.board[i][j-1] = jumped_value
+
+    def solve_dfs(self, depth=0, max_depth=4):
+        """
+        Depth-limited DFS: expand up to `max_depth` levels, adding every
+        position and jump to the visualizer's graph if one is attached.
+        """
+        node_id = make_node_id(self.board)  # unique node identifier
+
+        if node_id in self.visited:
+            return False
+        self.visited.add(node_id)
+
+        # Add the current board state as a node in the graph.
+        if self.vis is not None:
+            self.vis.G.add_node(node_id, label=board_to_str(self.board))
+
+        if depth == 0:
+            self.root_id = node_id  # store the root id for the layout
+            if self.trace is not None:
+                self.trace.root(node_id)
+
+        if self.is_solved():
+            if self.trace is not None:
+                self.trace.solved(node_id)
+            return True
+
+        if depth >= max_depth:
+            return False
+
+        for move in self.get_valid_moves():
+            jump = tuple(move[:3])  # make_move rewrites the position to the landing cell
+            self.make_move(move)
+            child_id = make_node_id(self.board)
+            seen = child_id in self.visited
+
+            if self.trace is not None:
+                self.trace.jump(node_id, child_id, jump, seen)
+            if self.vis is not None:
+                self.vis.G.add_node(child_id, label=board_to_str(self.board))
+                self.vis.G.add_edge(node_id, child_id)
+                self.vis.record_step(
+                    root_node=self.root_id,
+                    highlight_edge=(node_id, child_id),
+                    title=f"Depth {depth} -> {depth+1}"
+                )
+
+            if self.solve_dfs(depth + 1, max_depth):
+                return True
+
+            self.undo_move()  # Backtrack
+            if self.trace is not None and not seen:
+                self.trace.backtrack(node_id, child_id, jump)
+
+        return False
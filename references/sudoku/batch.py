@@ -0,0 +1,216 @@
+"""
+Solve and check sudoku in bulk: NumPy candidate tensors, scalar search only
+where it is needed.
+
+A batch of puzzles is an (n, 81) uint8 array, 0 for an empty cell. Their
+candidates are an (n, 81, 9) boolean tensor, and propagation works on all of
+them at once with per-digit counts over rows, columns and boxes:
+
+    naked singles   digits of solved cells are removed from their peers
+    hidden singles  a digit with one place left in a unit is placed there
+
+until no puzzle changes. Well-formed puzzles are mostly solved outright, and
+those with an empty cell or a digit with nowhere to go in some unit are
+unsolvable without any search. The rest first dive together: each puts the
+lowest candidate in its tightest cell and propagates again, and a guess that
+fails is struck out. Only puzzles the dive does not finish go one by one to
+solver.PropagatingSolver, starting from the reduced grid.
+
+    python batch.py puzzles.txt            one 81-character puzzle per line
+    python batch.py puzzles.txt --out solved.txt
+"""
+import argparse
+import time
+
+import numpy as np
+
+from solver import PropagatingSolver, UNITS
+
+UNIT_CELLS = np.array(UNITS, dtype=np.intp)  # (27, 9), for checking filled grids
+
+SOLVED, GUESSED, SEARCHED, UNSOLVABLE = range(4)
+STATUS = ("solved", "guessed", "searched", "unsolvable")
+
+
+def parse_lines(data: bytes) -> np.ndarray:
+    """81-character lines ('.' or '0' empty) -> (n, 81) uint8, without a
+    Python loop over puzzles."""
+    lines = [line.strip() for line in data.splitlines() if line.strip()]
+    if any(len(line) != 81 for line in lines):
+        raise ValueError("every puzzle is 81 characters")
+    text = np.frombuffer(b"".join(lines), dtype=np.uint8).reshape(-1, 81)
+    grid = np.where(text == ord("."), 0, text - ord("0")).astype(np.uint8)
+    if (grid > 9).any():
+        raise ValueError("puzzles are digits and '.' only")
+    return grid
+
+
+def to_lines(grids: np.ndarray) -> bytes:
+    text = grids.astype(np.uint8) + ord("0")
+    text[text == ord("0")] = ord(".")
+    return b"\n".join(row.tobytes() for row in text) + b"\n"
+
+
+def candidates(grids: np.ndarray) -> np.ndarray:
+    """(n, 81) grids -> (n, 81, 9) candidates: every digit for an empty
+    cell, only the given one otherwise."""
+    given = np.arange(1, 10, dtype=np.uint8) == grids[:, :, None]
+    return np.where((grids > 0)[:, :, None], given, True)
+
+
+def unit_counts(g: np.ndarray):
+    """Per-digit counts over the rows, columns and boxes of a (9, 9, 9, m)
+    row x column x digit x puzzle tensor, each shaped to broadcast back."""
+    u = g.view(np.uint8)
+    rows = u.sum(axis=1, dtype=np.uint8)[:, None]
+    cols = u.sum(axis=0, dtype=np.uint8)[None]
+    boxes = u.reshape(3, 3, 3, 3, 9, -1).sum(axis=(1, 3), dtype=np.uint8)
+    return rows, cols, boxes[:, None, :, None]
+
+
+def in_any_unit(test, counts) -> np.ndarray:
+    """(9, 9, 9, m): `test` holds for the digit in some unit of the cell."""
+    rows, cols, boxes = (test(n) for n in counts)
+    either = (rows | cols).reshape(3, 3, 3, 3, 9, -1)
+    return (either | boxes).reshape(9, 9, 9, -1)
+
+
+def any_count(test, counts) -> np.ndarray:
+    """(m,): `test` holds for some digit in some unit."""
+    return np.logical_or.reduce([test(n).any(axis=tuple(range(n.ndim - 1))) for n in counts])
+
+
+def propagate(cand: np.ndarray) -> np.ndarray:
+    """Naked and hidden singles on every puzzle until none changes. `cand`
+    is reduced in place; returns the puzzles left with a contradiction.
+
+    The work is done with the puzzle as the last axis, (9, 9, 9, m) rows x
+    columns x digits x puzzles, so every unit count is a sum of contiguous
+    runs of m and broadcasts straight back onto the cells."""
+    t = np.ascontiguousarray(cand.reshape(-1, 729).T).reshape(9, 9, 9, -1)
+    broken = np.zeros(len(cand), dtype=bool)
+    live = np.arange(len(cand))
+    while len(live):
+        before = c = t.take(live, axis=3)  # contiguous, unlike t[..., live]
+        single = c.view(np.uint8).sum(axis=2, dtype=np.uint8) == 1
+        # naked: a digit placed in a unit goes from the unit's other cells
+        placed = unit_counts(c & single[:, :, None])
+        clash = any_count(lambda n: n > 1, placed)
+        gone = in_any_unit(lambda n: n > 0, placed)
+        c = c & (single[:, :, None] | ~gone)
+        # hidden: a digit with one cell left in a unit goes in that cell
+        places = unit_counts(c)
+        nowhere = any_count(lambda n: n == 0, places)
+        only = in_any_unit(lambda n: n == 1, places) & c
+        forced = only.any(axis=2, keepdims=True)
+        torn = (only.view(np.uint8).sum(axis=2, dtype=np.uint8) > 1).any(axis=(0, 1))
+        c = c & (only | ~forced)
+        dead = clash | nowhere | torn | ~c.any(axis=2).all(axis=(0, 1))
+        changed = (c != before).any(axis=(0, 1, 2))
+        t[..., live] = c
+        broken[live[dead]] = True
+        live = live[changed & ~dead]
+    cand[:] = t.reshape(729, -1).T.reshape(cand.shape)
+    return broken
+
+
+def dive(cand: np.ndarray, depth: int) -> np.ndarray:
+    """Follow one branch of every puzzle at once: the lowest candidate of
+    the open cell with the fewest, then propagate, up to `depth` times.
+    Returns the puzzles whose dive filled the grid, which is then a
+    solution, and writes those into `cand`; the rest are left as they were
+    for the scalar search."""
+    trial = cand.copy()
+    done = np.zeros(len(cand), dtype=bool)
+    live = np.arange(len(cand))
+    for _ in range(depth + 1):
+        left = trial[live].sum(axis=2)
+        full = (left == 1).all(axis=1)
+        done[live[full]] = True
+        live, left = live[~full], left[~full]
+        if not len(live):
+            break
+        cell = np.where(left > 1, left, 10).argmin(axis=1)
+        digit = trial[live, cell].argmax(axis=1)
+        sub = trial[live]
+        before = sub.copy()
+        rows = np.arange(len(live))
+        sub[rows, cell] = False
+        sub[rows, cell, digit] = True
+        wrong = propagate(sub)
+        # a guess that fails is ruled out, and the dive goes on without it
+        back = before[wrong]
+        back[np.arange(len(back)), cell[wrong], digit[wrong]] = False
+        stuck = propagate(back)
+        sub[wrong] = back
+        trial[live] = sub
+        wrong[wrong] = stuck
+        live = live[~wrong]
+    cand[done] = trial[done]
+    return done
+
+
+def solve_batch(grids: np.ndarray, chunk: int = 1024, depth: int = 30):
+    """Solve an (n, 81) batch. Returns (solutions, status): the filled grids
+    (unsolvable rows keep their givens) and per puzzle how it was settled.
+    Puzzles propagation leaves open get a vectorised dive of up to `depth`
+    guesses first; only those it does not finish go to the scalar search.
+    `chunk` bounds the size of the candidate tensors."""
+    grids = np.asarray(grids, dtype=np.uint8).reshape(-1, 81)
+    out = grids.copy()
+    status = np.full(len(grids), SOLVED, dtype=np.uint8)
+    digits = np.arange(1, 10, dtype=np.uint8)
+    for start in range(0, len(grids), chunk):
+        part = slice(start, start + chunk)
+        cand = candidates(grids[part])
+        broken = propagate(cand)
+        status[part][broken] = UNSOLVABLE
+        open_ = np.flatnonzero(~broken & (cand.sum(axis=2) > 1).any(axis=1))
+        sub = cand[open_]
+        dived = dive(sub, depth)
+        cand[open_] = sub
+        status[start + open_[dived]] = GUESSED
+        single = cand.sum(axis=2) == 1
+        filled = np.where(single, (cand * digits).sum(axis=2), 0).astype(np.uint8)
+        out[part] = np.where(broken[:, None], grids[part], filled)
+        for k in open_[~dived]:
+            solver = PropagatingSolver(filled[k].tolist())
+            if solver.solve():
+                out[start + k] = solver.cells
+                status[start + k] = SEARCHED
+            else:
+                status[start + k] = UNSOLVABLE
+    return out, status
+
+
+def valid_grids(grids: np.ndarray) -> np.ndarray:
+    """True for each (n, 81) grid that is completely and correctly filled."""
+    units = np.sort(np.asarray(grids)[:, UNIT_CELLS], axis=2)
+    return (units == np.arange(1, 10)).all(axis=(1, 2))
+
+
+def keeps_givens(puzzles: np.ndarray, grids: np.ndarray) -> np.ndarray:
+    return ((puzzles == 0) | (puzzles == grids)).all(axis=1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("file", help="one 81-character puzzle per line")
+    parser.add_argument("--out", help="write the solutions here, one per line")
+    parser.add_argument("--chunk", type=int, default=1024, help="puzzles per tensor batch (small ones stay in cache)")
+    parser.add_argument("--depth", type=int, default=30, help="guesses per vectorised dive")
+    args = parser.parse_args()
+
+    with open(args.file, "rb") as f:
+        puzzles = parse_lines(f.read())
+    t0 = time.perf_counter()
+    solutions, status = solve_batch(puzzles, args.chunk, args.depth)
+    elapsed = time.perf_counter() - t0
+    ok = valid_grids(solutions) & keeps_givens(puzzles, solutions)
+    counts = np.bincount(status, minlength=len(STATUS))
+    print("%d puzzles in %.2fs:" % (len(puzzles), elapsed),
+          ", ".join("%d %s" % (n, name) for n, name in zip(counts, STATUS)),
+          "- %d solutions checked valid" % ok.sum())
+    if args.out:
+        with open(args.out, "wb") as f:
+            f.write(to_lines(solutions))
@@ -0,0 +1,169 @@
+"""
+Benchmark suite for the sudoku solvers.
+
+Runs every solver configuration over the bundled corpora in corpora/, one
+puzzle at a time, and records per puzzle the search nodes, the propagation
+steps by rule and the wall time; per corpus and configuration it prints the
+total nodes, the p50/p90/p99/max latency and which line of the corpus was
+slowest. Every returned grid goes through solver.isSolved and must keep
+the puzzle's givens, so a faster configuration that returns a wrong grid
+shows up as a failure, not a win.
+
+    mask       MaskSolver: MRV backtracking, no propagation
+    naked      PropagatingSolver with naked singles only
+    hidden     ... and hidden singles
+    propagate  ... and locked candidates (what Solution.solveSudoku runs)
+    dlx        dlx.SudokuCover; its "nodes" are dancing-links updates
+
+The corpora are
+
+    easy     40 puzzles from generator.py rated easy (seed 2026)
+    17clue   16 puzzles with 17 clues, the fewest a unique sudoku can have
+    hard     7 well-known hard puzzles (Inkala's, AI Escargot, Platinum
+             Blonde, Golden Nugget and others)
+    16x16    6 boards of 4x4 boxes (dlx only)
+
+each checked to have exactly one solution. --json writes every number, with
+the commit it ran on, for comparing runs over time; --baseline reads such a
+file back and prints each p50 as a ratio of the old one.
+
+    python bench.py
+    python bench.py --config propagate --config dlx --corpus hard --repeat 5
+    python bench.py --json before.json; ...; python bench.py --baseline before.json
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import time
+
+from dlx import SYMBOLS, SudokuCover, parse_grid
+from solver import RULES, MaskSolver, PropagatingSolver, isSolved
+
+CORPORA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpora")
+
+
+def run_mask(cells):
+    solver = MaskSolver(cells)
+    return (solver.cells if solver.solve() else None), solver.nodes, {}
+
+
+def propagating(rules):
+    def run(cells):
+        solver = PropagatingSolver(cells, rules)
+        return (solver.cells if solver.solve() else None), solver.nodes, dict(solver.steps)
+    return run
+
+
+def run_dlx(cells):
+    problem = SudokuCover(cells)
+    return problem.solve(), problem.updates, {}
+
+
+CONFIGS = {
+    "mask": run_mask,
+    "naked": propagating(()),
+    "hidden": propagating(RULES[:1]),
+    "propagate": propagating(RULES),
+    "dlx": run_dlx,
+}
+# configurations that only handle 9x9
+NINE_ONLY = {"mask", "naked", "hidden", "propagate"}
+
+
+def load(name):
+    with open(os.path.join(CORPORA, name + ".txt")) as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def verify(puzzle, cells):
+    """The solver's grid is a full valid board that keeps every given."""
+    if cells is None:
+        return False
+    n = math.isqrt(len(cells))
+    board = [[SYMBOLS[d - 1] if d else '.' for d in cells[r * n:r * n + n]] for r in range(n)]
+    return isSolved(board) and all(g == 0 or g == d for g, d in zip(puzzle, cells))
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an ascending list."""
+    k = max(0, math.ceil(p / 100 * len(sorted_values)) - 1)
+    return sorted_values[k]
+
+
+def run(config, puzzles, repeat=1):
+    """Per-puzzle records and a summary for one configuration."""
+    solve = CONFIGS[config]
+    records = []
+    for text in puzzles:
+        cells = parse_grid(text)
+        best = math.inf
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            result, nodes, steps = solve(list(cells))
+            best = min(best, time.perf_counter() - t0)
+        records.append({"puzzle": text, "nodes": nodes, "steps": steps,
+                        "ms": best * 1e3, "ok": verify(cells, result)})
+    times = sorted(r["ms"] for r in records)
+    summary = {"puzzles": len(records), "failed": sum(not r["ok"] for r in records),
+               "nodes": sum(r["nodes"] for r in records), "total_ms": sum(times)}
+    for p in (50, 90, 99):
+        summary["p%d_ms" % p] = percentile(times, p)
+    summary["max_ms"] = times[-1]
+    summary["slowest"] = max(range(len(records)), key=lambda k: records[k]["ms"])
+    return records, summary
+
+
+def commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, cwd=CORPORA, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == "__main__":
+    corpora = sorted(os.path.splitext(f)[0] for f in os.listdir(CORPORA) if f.endswith(".txt"))
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--config", action="append", choices=CONFIGS,
+                        help="solver configuration to run (default: all)")
+    parser.add_argument("--corpus", action="append", choices=corpora,
+                        help="corpus to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=1, help="time each puzzle this many times, keep the best")
+    parser.add_argument("--json", help="write every record and summary here")
+    parser.add_argument("--baseline", help="an earlier --json file to compare p50 against")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+    results = {}
+    failed = 0
+    for corpus in args.corpus or corpora:
+        puzzles = load(corpus)
+        nine = all(len(p) == 81 for p in puzzles)
+        print("%s (%d puzzles)" % (corpus, len(puzzles)))
+        for config in args.config or list(CONFIGS):
+            if config in NINE_ONLY and not nine:
+                continue
+            records, s = run(config, puzzles, args.repeat)
+            results.setdefault(corpus, {})[config] = {"summary": s, "puzzles": records}
+            failed += s["failed"]
+            line = "  %-10s nodes %10d  p50 %8.2fms  p90 %8.2fms  p99 %8.2fms  max %8.2fms (#%d)" % (
+                config, s["nodes"], s["p50_ms"], s["p90_ms"], s["p99_ms"], s["max_ms"], s["slowest"] + 1)
+            old = (baseline or {}).get(corpus, {}).get(config)
+            if old:
+                line += "  p50 x%.2f" % (s["p50_ms"] / old["summary"]["p50_ms"])
+            if s["failed"]:
+                line += "  %d WRONG" % s["failed"]
+            print(line)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"commit": commit(), "python": platform.python_version(),
+                       "machine": platform.machine(), "repeat": args.repeat,
+                       "results": results}, f, indent=1)
+    if failed:
+        raise SystemExit("%d grids failed verification" % failed)
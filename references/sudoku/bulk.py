@@ -0,0 +1,138 @@
+"""
+Solve a file of puzzles, one 81-character line each, as fast as the machine
+allows.
+
+The input is memory-mapped and cut into chunks at line boundaries; each chunk
+is only a (start, end) byte range, so nothing but offsets crosses to the
+worker processes. A worker maps the file itself, reads the puzzles straight
+out of the mapped bytes (no per-puzzle str or board-of-lists conversion),
+solves them with solver.PropagatingSolver and returns its solutions as one
+block of bytes. Blocks come back through an ordered imap, so the output is
+written as it arrives and still follows the input puzzle for puzzle.
+
+Every puzzle is timed on its own, and the report gives the throughput and
+the slowest puzzle with its position in the file.
+
+    python bulk.py puzzles.txt solutions.txt --workers 8
+    python bulk.py puzzles.txt - --chunk 4096
+"""
+import argparse
+import mmap
+import multiprocessing
+import os
+import sys
+import time
+from typing import Iterator, List, Tuple
+
+from solver import DIGITS, PropagatingSolver
+
+UNSOLVED = b"no solution"
+# '.' is an empty cell, as '0' is
+EMPTY_DOT = bytes.maketrans(b".", b"0")
+
+
+def chunks(buf, size: int) -> Iterator[Tuple[int, int]]:
+    """(start, end) byte ranges of about `size` bytes, each ending just
+    after a newline (or at the end of the buffer)."""
+    start, n = 0, len(buf)
+    while start < n:
+        end = buf.find(b"\n", min(start + size, n) - 1)
+        end = n if end < 0 else end + 1
+        yield start, end
+        start = end
+
+
+def puzzles(buf, start: int = 0, end: int = -1) -> Iterator[List[int]]:
+    """The puzzles in buf[start:end], as lists of 81 ints. Blank lines are
+    skipped; anything else that is not 81 digits or dots raises ValueError."""
+    end = len(buf) if end < 0 else end
+    while start < end:
+        nl = buf.find(b"\n", start, end)
+        stop = end if nl < 0 else nl
+        line = buf[start:stop].strip()
+        start = stop + 1
+        if not line:
+            continue
+        if len(line) != 81 or not line.translate(EMPTY_DOT).isdigit():
+            raise ValueError("not a puzzle: %r" % line[:90])
+        yield [c - 48 for c in line.translate(EMPTY_DOT)]
+
+
+def solve_range(path: str, start: int, end: int):
+    """Solve the puzzles in bytes start:end of `path`. Returns (output
+    block, count, unsolved, worst seconds, index of the worst puzzle)."""
+    out = []
+    unsolved = 0
+    worst, worst_at = 0.0, -1
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        for k, cells in enumerate(puzzles(buf, start, end)):
+            t0 = time.perf_counter()
+            solver = PropagatingSolver(cells)
+            solved = solver.solve()
+            elapsed = time.perf_counter() - t0
+            if elapsed > worst:
+                worst, worst_at = elapsed, k
+            if solved:
+                out.append("".join(DIGITS[d - 1] for d in solver.cells).encode())
+            else:
+                out.append(UNSOLVED)
+                unsolved += 1
+    return b"\n".join(out) + b"\n" if out else b"", len(out), unsolved, worst, worst_at
+
+
+def _solve_range(job):
+    return solve_range(*job)
+
+
+class Report:
+    def __init__(self):
+        self.puzzles = 0
+        self.unsolved = 0
+        self.seconds = 0.0
+        self.worst = 0.0
+        self.worst_puzzle = 0
+
+    @property
+    def rate(self) -> float:
+        return self.puzzles / self.seconds if self.seconds else 0.0
+
+    def __repr__(self):
+        return ("%d puzzles in %.2fs, %.0f puzzles/s, %d unsolved; slowest %.2fms (puzzle %d)"
+                % (self.puzzles, self.seconds, self.rate, self.unsolved,
+                   self.worst * 1e3, self.worst_puzzle))
+
+
+def solve_file(src: str, out, workers: int = None, chunk: int = 2048) -> Report:
+    """Solve every puzzle in the file `src`, writing one line per puzzle to
+    the binary stream `out` in input order. `chunk` is puzzles per job."""
+    report = Report()
+    t0 = time.perf_counter()
+    if os.path.getsize(src) == 0:
+        return report
+    with open(src, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        jobs = [(src, start, end) for start, end in chunks(buf, chunk * 82)]
+    with multiprocessing.Pool(workers) as pool:
+        for block, count, unsolved, worst, worst_at in pool.imap(_solve_range, jobs):
+            out.write(block)
+            if worst > report.worst:
+                report.worst, report.worst_puzzle = worst, report.puzzles + worst_at + 1
+            report.puzzles += count
+            report.unsolved += unsolved
+    report.seconds = time.perf_counter() - t0
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("src", help="one 81-character puzzle per line")
+    parser.add_argument("dst", help="solutions, one line per puzzle; - for stdout")
+    parser.add_argument("--workers", type=int, help="processes (default: one per CPU)")
+    parser.add_argument("--chunk", type=int, default=2048, help="puzzles per job")
+    args = parser.parse_args()
+
+    if args.dst == "-":
+        report = solve_file(args.src, sys.stdout.buffer, args.workers, args.chunk)
+    else:
+        with open(args.dst, "wb") as out:
+            report = solve_file(args.src, out, args.workers, args.chunk)
+    print(report, file=sys.stderr)
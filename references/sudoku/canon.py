@@ -0,0 +1,200 @@
+"""
+Canonical forms of sudoku under the puzzle's symmetry group, and a solution
+cache keyed by them.
+
+The group is generated by transposition, band and stack swaps, row swaps
+within a band, column swaps within a stack, and relabelling of the digits.
+The canonical form of a grid is the smallest 81-character string (0 for an
+empty cell) it can be sent to, digits numbered in order of first appearance.
+
+It is built one output row at a time. Every partial transform still in the
+running (transposed or not, a column order, the source rows chosen so far
+and the digit labels they fixed) is extended by each source row it may take
+next, all of them at once as NumPy arrays, and only those giving the
+smallest row survive. Row 0 starts from 2 x 9 x 1296 candidates, but in a
+puzzle whose rows have no repeated digit only its empty cells matter there,
+and ties fall away quickly after it.
+
+SolutionCache solves a puzzle's canonical form once and maps the stored
+solution back through the inverse of each new puzzle's transform, so
+relabelled, shuffled or transposed repeats are served without a search. An
+LRU dict holds recent entries; a dbm file, if given, keeps them all.
+
+    python canon.py 000000010400000000020000000000050407008000300001090000300400200050100000000806000
+    python canon.py --cache solutions.db < puzzles.txt
+"""
+import argparse
+import dbm
+import itertools
+import sys
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from solver import PropagatingSolver, parse, to_text
+
+
+def line_orders() -> np.ndarray:
+    """The 1296 orders of nine rows (or columns) that keep bands together."""
+    orders = []
+    for bands in itertools.permutations(range(3)):
+        for inner in itertools.product(itertools.permutations(range(3)), repeat=3):
+            orders.append([3 * b + i for b, perm in zip(bands, inner) for i in perm])
+    return np.array(orders, dtype=np.intp)
+
+
+ORDERS = line_orders()
+POWERS = 10 ** np.arange(8, -1, -1, dtype=np.int64)
+
+
+class Transform:
+    """canonical[i][j] = labels[g[rows[i]][cols[j]]], g the grid or, if
+    `transpose`, its transpose; labels[0] is 0."""
+
+    def __init__(self, transpose: bool, rows: List[int], cols: List[int], labels: List[int]):
+        self.transpose = transpose
+        self.rows = rows
+        self.cols = cols
+        self.labels = labels
+
+    def apply(self, cells: List[int]) -> List[int]:
+        g = [cells[i::9] for i in range(9)] if self.transpose else [cells[9 * r:9 * r + 9] for r in range(9)]
+        return [self.labels[g[r][c]] for r in self.rows for c in self.cols]
+
+    def invert(self, cells: List[int]) -> List[int]:
+        """The grid that apply() sends to `cells`."""
+        unlabel = [0] * 10
+        for d, label in enumerate(self.labels):
+            unlabel[label] = d
+        out = [0] * 81
+        for i, r in enumerate(self.rows):
+            for j, c in enumerate(self.cols):
+                r2, c2 = (c, r) if self.transpose else (r, c)
+                out[r2 * 9 + c2] = unlabel[cells[i * 9 + j]]
+        return out
+
+
+def canonical(cells: List[int]) -> Tuple[str, Transform]:
+    """(canonical form, a transform taking `cells` to it)."""
+    g = np.array(cells, dtype=np.intp).reshape(9, 9)
+    grids = np.stack([g, g.T])
+    distinct = all(len(set(v for v in line if v)) == np.count_nonzero(line)
+                   for line in np.vstack([g, g.T]))
+    # state of every candidate; source rows are chosen as they go
+    t = np.repeat(np.arange(2), len(ORDERS))
+    cols = np.tile(ORDERS, (2, 1))
+    rows = np.zeros((len(t), 0), dtype=np.intp)
+    labels = np.zeros((len(t), 10), dtype=np.intp)
+    nxt = np.ones(len(t), dtype=np.intp)
+    out = []
+    for k in range(9):
+        # every candidate tries every source row; keep the legal ones
+        n = len(t)
+        src = np.tile(np.arange(9), n)
+        idx = np.repeat(np.arange(n), 9)
+        used = np.zeros((n, 9), dtype=bool)
+        used[np.arange(n)[:, None], rows] = True
+        legal = ~used.ravel()
+        if k % 3:
+            legal &= src // 3 == rows[idx, -1] // 3
+        idx, src = idx[legal], src[legal]
+        vals = grids[t[idx, None], src[:, None], cols[idx]]
+        if k == 0 and distinct:
+            # nothing is labelled yet and the row has no repeats, so it will
+            # read 0s and 1, 2, 3...: only where its empty cells fall matters
+            pattern = (vals > 0) @ POWERS
+            keep = pattern == pattern.min()
+            idx, src, vals = idx[keep], src[keep], vals[keep]
+        t, cols, rows = t[idx], cols[idx], np.column_stack([rows[idx], src])
+        labels, nxt = labels[idx].copy(), nxt[idx].copy()
+        at = np.arange(len(t))
+        row = np.empty_like(vals)
+        for j in range(9):
+            v = vals[:, j]
+            new = (v > 0) & (labels[at, v] == 0)
+            labels[at[new], v[new]] = nxt[new]
+            nxt += new
+            row[:, j] = labels[at, v]
+        key = row @ POWERS
+        best = key == key.min()
+        t, cols, rows, labels, nxt = t[best], cols[best], rows[best], labels[best], nxt[best]
+        out.append(row[best][0])
+        if len(t) > 1:
+            # candidates that used the same rows in another order now have
+            # the same future; sparse grids would otherwise keep millions
+            state = np.column_stack([t, (1 << rows).sum(axis=1), rows[:, -1] // 3, labels, cols])
+            _, first = np.unique(state, axis=0, return_index=True)
+            t, cols, rows, labels, nxt = t[first], cols[first], rows[first], labels[first], nxt[first]
+    # digits the grid never uses take the labels left over, in order
+    labels = labels[0].tolist()
+    spare = iter(d for d in range(1, 10) if d not in labels)
+    labels = [label or (d and next(spare)) for d, label in enumerate(labels)]
+    text = "".join(str(v) for row in out for v in row)
+    return text, Transform(bool(t[0]), rows[0].tolist(), cols[0].tolist(), labels)
+
+
+class SolutionCache:
+    """Solutions by canonical form: an LRU of `capacity` entries in memory
+    and, with `path`, every entry in a dbm file as well."""
+
+    def __init__(self, capacity: int = 10000, path: Optional[str] = None):
+        self.capacity = capacity
+        self.lru = OrderedDict()
+        self.db = dbm.open(path, "c") if path else None
+        self.hits = self.misses = 0
+
+    def lookup(self, key: str) -> Optional[str]:
+        if key in self.lru:
+            self.lru.move_to_end(key)
+            return self.lru[key]
+        if self.db is not None and key in self.db:
+            value = self.db[key].decode()
+            self.remember(key, value)
+            return value
+        return None
+
+    def remember(self, key: str, value: str) -> None:
+        self.lru[key] = value
+        self.lru.move_to_end(key)
+        if len(self.lru) > self.capacity:
+            self.lru.popitem(last=False)
+
+    def solve(self, cells: List[int]) -> Optional[List[int]]:
+        """The solution of `cells`, from the cache if an equivalent puzzle
+        was solved before; None if it has none."""
+        key, transform = canonical(cells)
+        value = self.lookup(key)
+        if value is None:
+            self.misses += 1
+            solver = PropagatingSolver(parse(key))
+            value = to_text(solver.cells) if solver.solve() else "-"
+            self.remember(key, value)
+            if self.db is not None:
+                self.db[key] = value
+        else:
+            self.hits += 1
+        return None if value == "-" else transform.invert(parse(value))
+
+    def close(self) -> None:
+        if self.db is not None:
+            self.db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("puzzles", nargs="*", help="81-character puzzles (default: stdin)")
+    parser.add_argument("--cache", help="dbm file to keep solutions in")
+    parser.add_argument("--capacity", type=int, default=10000, help="entries in memory")
+    args = parser.parse_args()
+
+    cache = SolutionCache(args.capacity, args.cache)
+    for text in args.puzzles or (line for line in sys.stdin if line.strip()):
+        t0 = time.perf_counter()
+        hits = cache.hits
+        cells = cache.solve(parse(text))
+        print(to_text(cells) if cells else "no solution", "hit" if cache.hits > hits else "miss",
+              "%.2fms" % ((time.perf_counter() - t0) * 1e3))
+    cache.close()
+    print("%d hits, %d misses" % (cache.hits, cache.misses), file=sys.stderr)
@@ -0,0 +1,386 @@
+"""
+Exact cover by Algorithm X with dancing links, for sudoku of any box size.
+
+solver.py is tied to 9x9 (3x3 boxes, the digits 1-9); here a puzzle is just
+a set of rows over constraint columns, and sudoku is one client of it:
+
+    sudoku   a row per (cell, symbol); columns: each cell filled once, and
+             each symbol once per row, column and box of any br x bc shape
+    queens   a row per square; columns: each rank and file once (primary),
+             each diagonal at most once (secondary)
+
+The links live in flat lists (left, right, up, down, column) instead of node
+objects, and the search is iterative, so 25x25 boards (15,625 rows over
+2,500 columns) neither recurse 625 deep nor allocate per step. Columns are
+chosen by fewest remaining rows, which is the MRV rule of solver.py; a
+column down to one row is a naked or hidden single, taken before any guess.
+
+Search time on big sparse boards is heavy-tailed, and much of the tail is
+down to order: which of several equally short columns is taken, and which
+of its rows is tried first. SudokuCover.solve therefore runs searches side
+by side, each over the columns and rows in a different shuffled order
+(the first unshuffled). Round k starts one more search and then gives every
+search 2^k slices of SLICE updates, until one finds a solution (or one runs
+out, and there is none). No search loses the work it has done.
+
+What that buys, on one core:
+
+    corpora/16x16.txt       worst 7.3s, the rest under 2s (was 5-7s for #6
+                            alone, now 0.8s)
+    random 25x25, 60% given about 0.1s
+    random 25x25, 45-50%    median about 6s; 15 of 18 boards tried solve in
+                            under 18s, 3 do not finish within 2 minutes
+
+Random boards at 40-55% givens sit at the hardness peak of partial Latin
+squares, where no order helps for long. There is no latency bound for them
+here: give solve() such boards only with a timeout around it.
+
+    python dlx.py sudoku 000000010400000000020000000000050407008000300001090000300400200050100000000806000
+    python dlx.py sudoku --file puzzles16.txt
+    python dlx.py queens 12 --count
+"""
+import argparse
+import math
+import random
+import sys
+import time
+from typing import Iterator, List, Optional
+
+# symbols of boards up to 25x25; '.' or '0' is an empty cell
+SYMBOLS = "123456789ABCDEFGHIJKLMNOP"
+# the other usual way to write 16x16 boards, 0-F
+HEX_STYLE = "0123456789ABCDEFGHIJKLMNO"
+# updates in one slice of a search in SudokuCover.solve
+SLICE = 1 << 18
+
+
+class ExactCover:
+    def __init__(self, primary: int, secondary: int = 0):
+        """Columns 0..primary-1 must each be covered exactly once; the
+        `secondary` columns after them at most once."""
+        self.primary = primary
+        n = primary + secondary
+        # node 0 is the root, nodes 1..n the column headers
+        self.L = [i - 1 for i in range(n + 1)]
+        self.R = [i + 1 for i in range(n + 1)]
+        self.L[0], self.R[primary] = primary, 0
+        for c in range(primary + 1, n + 1):
+            self.L[c] = self.R[c] = c  # secondary: never chosen, only covered
+        self.U = list(range(n + 1))
+        self.D = list(range(n + 1))
+        self.C = list(range(n + 1))
+        self.S = [0] * (n + 1)
+        self.ROW = [-1] * (n + 1)
+        self.starts = []     # first node of every row
+        self.given = []      # rows selected before the search
+        self.consistent = True
+        self.updates = 0     # nodes unlinked, the usual measure of DLX work
+
+    def add_row(self, columns: List[int]) -> int:
+        """Add a row covering `columns` (0-based); returns its id."""
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        row = len(self.starts)
+        first = len(L)
+        for k, col in enumerate(columns):
+            c = col + 1
+            x = len(L)
+            L.append(x - 1 if k else x)
+            R.append(first)
+            R[x - 1 if k else x] = x
+            L[first] = x
+            U.append(U[c])
+            D.append(c)
+            D[U[c]] = x
+            U[c] = x
+            C.append(c)
+            self.ROW.append(row)
+            S[c] += 1
+        self.starts.append(first)
+        return row
+
+    def cover(self, c: int) -> None:
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        L[R[c]] = L[c]
+        R[L[c]] = R[c]
+        i = D[c]
+        while i != c:
+            j = R[i]
+            while j != i:
+                U[D[j]] = U[j]
+                D[U[j]] = D[j]
+                S[C[j]] -= 1
+                self.updates += 1
+                j = R[j]
+            i = D[i]
+
+    def uncover(self, c: int) -> None:
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        i = U[c]
+        while i != c:
+            j = L[i]
+            while j != i:
+                S[C[j]] += 1
+                U[D[j]] = j
+                D[U[j]] = j
+                j = L[j]
+            i = U[i]
+        L[R[c]] = c
+        R[L[c]] = c
+
+    def take(self, r: int) -> None:
+        """Cover the other columns of the row through node r."""
+        j = self.R[r]
+        while j != r:
+            self.cover(self.C[j])
+            j = self.R[j]
+
+    def untake(self, r: int) -> None:
+        j = self.L[r]
+        while j != r:
+            self.uncover(self.C[j])
+            j = self.L[j]
+
+    def select(self, row: int) -> None:
+        """Fix `row` in every solution, as a sudoku given is."""
+        first = self.starts[row]
+        x = first
+        while True:
+            c = self.C[x]
+            # a covered column was already used by an earlier selection
+            if self.R[self.L[c]] != c and c <= self.primary:
+                self.consistent = False
+                return
+            x = self.R[x]
+            if x == first:
+                break
+        self.cover(self.C[first])
+        self.take(first)
+        self.given.append(row)
+
+    def choose(self) -> int:
+        R, S = self.R, self.S
+        c = R[0]
+        best, best_s = c, S[c]
+        while c and best_s > 1:
+            if S[c] < best_s:
+                best, best_s = c, S[c]
+            c = R[c]
+        return best
+
+    def solutions(self, limit: Optional[int] = None,
+                  budget: Optional[int] = None) -> Iterator[List[int]]:
+        """Yield each exact cover as a list of row ids (givens first). With
+        `budget`, also yield None after every `budget` updates, so the caller
+        can set the search aside and resume it with next()."""
+        if not self.consistent:
+            return
+        R, D, S, ROW = self.R, self.D, self.S, self.ROW
+        cols, chosen = [], []
+        found = 0
+        stop = None if budget is None else self.updates + budget
+        try:
+            while True:
+                if R[0] == 0:
+                    yield self.given + [ROW[r] for r in chosen]
+                    found += 1
+                    if limit is not None and found >= limit:
+                        return
+                else:
+                    if stop is not None and self.updates > stop:
+                        yield None
+                        stop = self.updates + budget
+                    c = self.choose()
+                    if S[c]:
+                        self.cover(c)
+                        cols.append(c)
+                        r = D[c]
+                        self.take(r)
+                        chosen.append(r)
+                        continue
+                # backtrack to the deepest column with another row to try
+                while cols:
+                    r = chosen.pop()
+                    self.untake(r)
+                    r = D[r]
+                    c = cols[-1]
+                    if r != c:
+                        self.take(r)
+                        chosen.append(r)
+                        break
+                    self.uncover(c)
+                    cols.pop()
+                else:
+                    return
+        finally:
+            # stopped early, or closed by the caller: put the links back
+            while chosen:
+                self.untake(chosen.pop())
+                self.uncover(cols.pop())
+
+    def count(self, limit: Optional[int] = None) -> int:
+        return sum(1 for _ in self.solutions(limit))
+
+
+def box_shape(n: int) -> tuple:
+    """(rows, cols) of a box on an n x n board: as square as divides n."""
+    br = int(math.isqrt(n))
+    while n % br:
+        br -= 1
+    return br, n // br
+
+
+def board_symbols(chars, n: int) -> str:
+    """The n symbols a board written with `chars` uses: 1-9 then letters,
+    or 0-9 then letters (so '0' is a symbol, not an empty cell)."""
+    chars = set(chars) - {"."}
+    for alphabet in (SYMBOLS, HEX_STYLE):
+        if chars <= set(alphabet[:n]):
+            return alphabet[:n]
+    raise ValueError("symbols %s do not fit a %dx%d board" % ("".join(sorted(chars)), n, n))
+
+
+def parse_grid(text: str, symbols: Optional[str] = None) -> List[int]:
+    """A board of n*n symbols (whitespace ignored) -> cell values, 0 empty.
+    Without `symbols`, '.' or '0' is empty and the rest are SYMBOLS; with
+    them, only '.' is empty."""
+    text = "".join(text.split())
+    n = math.isqrt(len(text))
+    if n * n != len(text) or n > len(SYMBOLS):
+        raise ValueError("%d symbols is not a square board up to 25x25" % len(text))
+    if symbols is not None:
+        return [0 if ch == "." else symbols.index(ch) + 1 for ch in text]
+    return [0 if ch in ".0" else SYMBOLS.index(ch.upper()) + 1 for ch in text]
+
+
+def format_grid(cells: List[int], symbols: str = SYMBOLS) -> str:
+    return "".join(symbols[v - 1] if v else "." for v in cells)
+
+
+class SudokuCover:
+    """An n x n sudoku (n = br * bc) as an exact cover problem. With a
+    `seed`, the rows and the columns go in in a shuffled order, so the
+    search branches on other constraints and tries their rows in another
+    order."""
+    def __init__(self, cells: List[int], box: Optional[tuple] = None, seed: Optional[int] = None):
+        n = math.isqrt(len(cells))
+        if n * n != len(cells):
+            raise ValueError("not a square board")
+        self.n = n
+        self.box = box
+        br, bc = box or box_shape(n)
+        self.cells = list(cells)
+        self.cover = ExactCover(4 * n * n)
+        self.updates = 0     # over every search solve() ran
+        self.searches = 0
+        options = [(i, v) for i in range(n * n) for v in range(n)]
+        # where each constraint sits in the column list: choose() takes the
+        # first of the columns with fewest rows, so this breaks its ties
+        place = list(range(4 * n * n))
+        if seed is not None:
+            rng = random.Random(seed)
+            rng.shuffle(options)
+            rng.shuffle(place)
+        self.option = options    # row id -> (cell, symbol)
+        row_of = {}
+        for i, v in options:
+            r, c = divmod(i, n)
+            b = (r // br) * br + c // bc
+            row_of[i, v] = self.cover.add_row([place[i],
+                                               place[n * n + r * n + v],
+                                               place[2 * n * n + c * n + v],
+                                               place[3 * n * n + b * n + v]])
+        for i, v in enumerate(cells):
+            if v:
+                self.cover.select(row_of[i, v - 1])
+
+    def decode(self, rows: List[int]) -> List[int]:
+        cells = [0] * (self.n * self.n)
+        for row in rows:
+            i, v = self.option[row]
+            cells[i] = v + 1
+        return cells
+
+    def solve(self) -> Optional[List[int]]:
+        """A solution, or None if there is none, from searches over
+        differently shuffled columns and rows run side by side (see the
+        module docstring); self.searches is how many it took. 16x16 boards
+        take seconds at most, but a 25x25 with 40-55% of its cells given
+        can run for minutes."""
+        searches = []
+        try:
+            while True:
+                problem = SudokuCover(self.cells, self.box, seed=len(searches)) if searches else self
+                searches.append((problem, problem.cover.solutions(1, SLICE)))
+                for problem, search in searches:
+                    for _ in range(1 << (len(searches) - 1)):
+                        rows = next(search, ())
+                        if rows is not None:
+                            return problem.decode(rows) if rows else None
+        finally:
+            self.searches = len(searches)
+            self.updates = sum(problem.cover.updates for problem, _ in searches)
+            for _, search in searches:
+                search.close()
+
+    def count(self, limit: Optional[int] = None) -> int:
+        n = self.cover.count(limit)
+        self.updates = self.cover.updates
+        return n
+
+
+def n_queens(n: int) -> ExactCover:
+    """Rows r*n + c; ranks and files primary, the 2(2n-1) diagonals secondary."""
+    cover = ExactCover(2 * n, 2 * (2 * n - 1))
+    for r in range(n):
+        for c in range(n):
+            cover.add_row([r, n + c, 2 * n + r + c, 2 * n + (2 * n - 1) + r - c + n - 1])
+    return cover
+
+
+def queens_positions(n: int, rows: List[int]) -> List[int]:
+    """Column of the queen on each rank, from a solution's row ids."""
+    cols = [0] * n
+    for row in rows:
+        r, c = divmod(row, n)
+        cols[r] = c
+    return cols
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    sub = parser.add_subparsers(dest="puzzle", required=True)
+    s = sub.add_parser("sudoku", help="solve boards of n*n symbols")
+    s.add_argument("grids", nargs="*", help="boards (default: one per line of --file or stdin)")
+    s.add_argument("--file")
+    s.add_argument("--box", help="box shape as RxC (default: as square as divides n)")
+    s.add_argument("--count", action="store_true", help="count solutions instead (stops at 2)")
+    q = sub.add_parser("queens", help="place n non-attacking queens")
+    q.add_argument("n", type=int)
+    q.add_argument("--count", action="store_true", help="count every solution")
+    args = parser.parse_args()
+
+    if args.puzzle == "queens":
+        cover = n_queens(args.n)
+        t0 = time.perf_counter()
+        if args.count:
+            print("%d solutions" % cover.count(), end="")
+        else:
+            rows = next(cover.solutions(1), None)
+            print(queens_positions(args.n, rows) if rows is not None else "no solution", end="")
+        print(", %d updates, %.3fs" % (cover.updates, time.perf_counter() - t0))
+        sys.exit()
+
+    grids = args.grids
+    if not grids:
+        lines = open(args.file) if args.file else sys.stdin
+        grids = [line for line in lines if line.strip()]
+    box = tuple(int(x) for x in args.box.split("x")) if args.box else None
+    for text in grids:
+        t0 = time.perf_counter()
+        problem = SudokuCover(parse_grid(text), box)
+        if args.count:
+            result = "%d solutions" % problem.count(2)
+        else:
+            cells = problem.solve()
+            result = format_grid(cells) if cells else "no solution"
+        print(result, "%d updates %.2fms" % (problem.updates, (time.perf_counter() - t0) * 1e3))
@@ -0,0 +1,234 @@
+"""
+Puzzle generation: unique-solution sudoku rated by the deductions they need,
+and an on-disk pool of them so serving one is a pop, not a search.
+
+A puzzle starts as a random full grid: the three diagonal boxes are
+independent, so they are shuffled in and the solver fills the rest. Clues
+are then taken away in random order, and each removal stays only if
+PropagatingSolver.count(2) still finds exactly one solution.
+
+The rating is the smallest rule set that solves the puzzle with no guessing:
+
+    easy     naked singles
+    medium   and hidden singles
+    hard     and locked candidates
+    expert   needs branching
+
+PuzzlePool keeps one file of fixed-width 82-byte records per rating, so
+pop() reads the last record and truncates the file: O(1) whatever its size.
+Worker processes generate puzzles in the background and the pool files
+each under its rating until every file is back to its target.
+
+    python generator.py new --difficulty hard
+    python generator.py fill pool/ --target 200 --workers 4
+    python generator.py pop pool/ medium
+    python generator.py rate 000000010400000000020000000000050407008000300001090000300400200050100000000806000
+"""
+import argparse
+import fcntl
+import multiprocessing
+import os
+import random
+import threading
+import time
+from typing import List, Optional
+
+from solver import RULES, PropagatingSolver, parse, to_text
+
+DIFFICULTIES = ("easy", "medium", "hard", "expert")
+LEVELS = [("easy", ()), ("medium", RULES[:1]), ("hard", RULES)]
+RECORD = 82  # 81 characters and a newline
+
+
+def full_grid(rng: random.Random) -> List[int]:
+    """A random solved grid."""
+    cells = [0] * 81
+    for box in (0, 4, 8):
+        digits = rng.sample(range(1, 10), 9)
+        for k, d in enumerate(digits):
+            cells[(box // 3) * 27 + (box % 3) * 3 + (k // 3) * 9 + k % 3] = d
+    solver = PropagatingSolver(cells)
+    solver.solve()
+    # the solver tries low digits first; relabel so that does not show
+    relabel = [0] + rng.sample(range(1, 10), 9)
+    return [relabel[d] for d in solver.cells]
+
+
+def unique(cells: List[int]) -> bool:
+    return PropagatingSolver(cells).count(2) == 1
+
+
+def remove_clues(grid: List[int], rng: random.Random, symmetric: bool = True) -> List[int]:
+    """Clear cells of `grid` in random order while the solution stays
+    unique. With `symmetric`, cells go in pairs i, 80 - i."""
+    cells = list(grid)
+    order = list(range(41 if symmetric else 81))
+    rng.shuffle(order)
+    for i in order:
+        group = {i, 80 - i} if symmetric else {i}
+        saved = [cells[j] for j in group]
+        for j in group:
+            cells[j] = 0
+        if not unique(cells):
+            for j, d in zip(group, saved):
+                cells[j] = d
+    return cells
+
+
+def rate(cells: List[int]) -> str:
+    """The name of the smallest rule set that solves `cells` without a
+    guess (see the module docstring)."""
+    for name, rules in LEVELS:
+        solver = PropagatingSolver(cells, rules)
+        if solver.consistent and solver.propagate() and solver.pick() < 0:
+            return name
+    return "expert"
+
+
+def generate(rng: Optional[random.Random] = None, difficulty: Optional[str] = None,
+             tries: int = 1000):
+    """(puzzle, rating) of one new puzzle, of the given difficulty if any.
+    Raises RuntimeError if `tries` puzzles all rate differently."""
+    rng = rng or random.Random()
+    for _ in range(tries):
+        puzzle = remove_clues(full_grid(rng), rng)
+        rating = rate(puzzle)
+        if difficulty is None or rating == difficulty:
+            return puzzle, rating
+    raise RuntimeError("no %s puzzle in %d tries" % (difficulty, tries))
+
+
+def _generate(seed):
+    puzzle, rating = generate(random.Random(seed))
+    return rating, to_text(puzzle)
+
+
+class PuzzlePool:
+    """Pre-generated puzzles per difficulty, one file each in `directory`.
+    Files are locked around every read and write, so any number of
+    processes can pop while one fills."""
+
+    def __init__(self, directory: str, target: int = 100, workers: Optional[int] = None):
+        self.directory = directory
+        self.target = target
+        self.workers = workers or os.cpu_count()
+        os.makedirs(directory, exist_ok=True)
+        self.wanted = threading.Event()
+        self.stopped = threading.Event()
+        self.filler = None
+
+    def path(self, difficulty: str) -> str:
+        if difficulty not in DIFFICULTIES:
+            raise ValueError("difficulty is one of %s" % ", ".join(DIFFICULTIES))
+        return os.path.join(self.directory, difficulty + ".txt")
+
+    def size(self, difficulty: str) -> int:
+        try:
+            return os.path.getsize(self.path(difficulty)) // RECORD
+        except FileNotFoundError:
+            return 0
+
+    def push(self, difficulty: str, puzzle: List[int]) -> None:
+        with open(self.path(difficulty), "ab") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            f.write(to_text(puzzle).encode() + b"\n")
+
+    def pop(self, difficulty: str) -> Optional[List[int]]:
+        """Take a puzzle from the pool, None if it is empty. Falling below
+        the target wakes the background filler, if one is running."""
+        try:
+            f = open(self.path(difficulty), "r+b")
+        except FileNotFoundError:
+            self.wanted.set()
+            return None
+        with f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            end = f.seek(0, os.SEEK_END) // RECORD * RECORD
+            if end:
+                f.seek(end - RECORD)
+                record = f.read(RECORD)
+                f.truncate(end - RECORD)
+        if end // RECORD <= self.target:
+            self.wanted.set()
+        return parse(record[:81].decode()) if end else None
+
+    def get(self, difficulty: str) -> List[int]:
+        """A puzzle from the pool, or a freshly generated one if it is empty."""
+        puzzle = self.pop(difficulty)
+        if puzzle is None:
+            puzzle, _ = generate(difficulty=difficulty)
+        return puzzle
+
+    def short(self) -> List[str]:
+        return [d for d in DIFFICULTIES if self.size(d) < self.target]
+
+    def fill(self, seed: Optional[int] = None) -> int:
+        """Generate in a process pool until every difficulty has `target`
+        puzzles; returns how many were added. Each puzzle is filed under
+        the rating it comes out with, and dropped if that file is full."""
+        rng = random.Random(seed)
+        added = 0
+        if not self.short():
+            return added
+        with multiprocessing.Pool(self.workers) as pool:
+            # in rounds, as the pool would drain an endless seed iterator
+            while self.short() and not self.stopped.is_set():
+                seeds = [rng.getrandbits(64) for _ in range(4 * self.workers)]
+                for rating, text in pool.imap_unordered(_generate, seeds):
+                    if self.size(rating) < self.target:
+                        self.push(rating, parse(text))
+                        added += 1
+        return added
+
+    def start(self) -> None:
+        """Keep the pool topped up from a background thread: it fills once
+        now and again whenever a pop leaves a difficulty short."""
+        def run():
+            while not self.stopped.is_set():
+                self.wanted.clear()
+                self.fill()
+                self.wanted.wait()
+        self.wanted.set()
+        self.filler = threading.Thread(target=run, daemon=True)
+        self.filler.start()
+
+    def stop(self) -> None:
+        self.stopped.set()
+        self.wanted.set()
+        if self.filler is not None:
+            self.filler.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    n = sub.add_parser("new", help="generate a puzzle now")
+    n.add_argument("--difficulty", choices=DIFFICULTIES)
+    n.add_argument("--seed", type=int)
+    f = sub.add_parser("fill", help="top a pool directory up to --target per difficulty")
+    f.add_argument("directory")
+    f.add_argument("--target", type=int, default=100)
+    f.add_argument("--workers", type=int)
+    p = sub.add_parser("pop", help="take a puzzle from a pool directory")
+    p.add_argument("directory")
+    p.add_argument("difficulty", choices=DIFFICULTIES)
+    r = sub.add_parser("rate", help="check and rate puzzles")
+    r.add_argument("puzzles", nargs="+")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    if args.command == "new":
+        puzzle, rating = generate(random.Random(args.seed), args.difficulty)
+        print(to_text(puzzle), rating, "%d clues" % sum(1 for d in puzzle if d), end=" ")
+    elif args.command == "fill":
+        pool = PuzzlePool(args.directory, args.target, args.workers)
+        print("added %d:" % pool.fill(),
+              ", ".join("%d %s" % (pool.size(d), d) for d in DIFFICULTIES), end=" ")
+    elif args.command == "pop":
+        puzzle = PuzzlePool(args.directory).pop(args.difficulty)
+        print(to_text(puzzle) if puzzle else "pool is empty", end=" ")
+    else:
+        for text in args.puzzles:
+            cells = parse(text)
+            print(text, rate(cells) if unique(cells) else "not unique")
+    print("%.2fms" % ((time.perf_counter() - t0) * 1e3))
@@ -0,0 +1,181 @@
+"""
+A sudoku being played: kept up to date one keystroke at a time, so checking
+the board after each one costs microseconds rather than a rescan.
+
+For every unit and digit the session keeps the set of cells holding that
+digit. Setting or clearing a cell touches one digit in three units, so:
+
+    conflicts()   the cells of every unit/digit set with more than one cell;
+                  the session tracks which sets those are
+    candidates()  the digits no unit of the cell holds yet, from three
+                  bitmasks kept alongside the sets
+    solvable()    when the puzzle has one solution (found once, up front),
+                  true while no entry disagrees with it; the session counts
+                  the entries that do. Otherwise it asks PropagatingSolver,
+                  once per board
+    hint()        the next naked or hidden single, with the reason
+
+    python session.py 000000010400000000020000000000050407008000300001090000300400200050100000000806000
+"""
+import sys
+import time
+from typing import List, Optional, Set
+
+from solver import ALL, BOX, COL, POPCOUNT, ROW, UNITS, PropagatingSolver, parse, to_text
+
+# the three units of each cell, as indices into UNITS
+CELL_UNITS = [(ROW[i], 9 + COL[i], 18 + BOX[i]) for i in range(81)]
+UNIT_NAMES = ["row %d" % (u + 1) for u in range(9)] + ["column %d" % (u + 1) for u in range(9)] \
+    + ["box %d" % (u + 1) for u in range(9)]
+
+
+class Hint:
+    def __init__(self, cell: int, digit: int, reason: str):
+        self.cell = cell
+        self.digit = digit
+        self.reason = reason
+
+    def __repr__(self):
+        return "r%dc%d = %d (%s)" % (self.cell // 9 + 1, self.cell % 9 + 1, self.digit, self.reason)
+
+
+class Session:
+    def __init__(self, puzzle: List[int]):
+        self.cells = [0] * 81
+        self.given = [d > 0 for d in puzzle]
+        self.holders = [[set() for _ in range(10)] for _ in range(27)]
+        self.used = [0] * 27       # digits present in each unit, as bits
+        self.clashes = set()       # (unit, digit) held by two cells or more
+        self.wrong = 0             # entries that disagree with self.solution
+        self.version = 0
+        self.checked = (-1, False)  # (version, answer) of the last search
+        self.solution = None
+        for i, d in enumerate(puzzle):
+            if d:
+                self.put(i, d)
+        if not self.clashes:
+            solver = PropagatingSolver(puzzle)
+            if solver.count(2) == 1:
+                self.solution = solver.solution
+
+    def put(self, i: int, d: int) -> None:
+        self.cells[i] = d
+        for u in CELL_UNITS[i]:
+            cells = self.holders[u][d]
+            cells.add(i)
+            self.used[u] |= 1 << (d - 1)
+            if len(cells) > 1:
+                self.clashes.add((u, d))
+        if self.solution is not None and self.solution[i] != d:
+            self.wrong += 1
+        self.version += 1
+
+    def take(self, i: int) -> None:
+        d = self.cells[i]
+        self.cells[i] = 0
+        for u in CELL_UNITS[i]:
+            cells = self.holders[u][d]
+            cells.discard(i)
+            if not cells:
+                self.used[u] &= ~(1 << (d - 1))
+            elif len(cells) == 1:
+                self.clashes.discard((u, d))
+        if self.solution is not None and self.solution[i] != d:
+            self.wrong -= 1
+        self.version += 1
+
+    def set(self, i: int, d: int) -> None:
+        """Enter digit d (1-9) in cell i, replacing what was there."""
+        if self.given[i]:
+            raise ValueError("r%dc%d is a given" % (i // 9 + 1, i % 9 + 1))
+        if not 1 <= d <= 9:
+            raise ValueError("a digit is 1-9, got %r" % d)
+        if self.cells[i]:
+            self.take(i)
+        self.put(i, d)
+
+    def clear(self, i: int) -> None:
+        if self.given[i]:
+            raise ValueError("r%dc%d is a given" % (i // 9 + 1, i % 9 + 1))
+        if self.cells[i]:
+            self.take(i)
+
+    def candidates(self, i: int) -> int:
+        """Digits cell i could still take, as bits (bit d-1 for digit d);
+        0 for a filled cell."""
+        if self.cells[i]:
+            return 0
+        r, c, b = CELL_UNITS[i]
+        return ALL & ~(self.used[r] | self.used[c] | self.used[b])
+
+    def conflicts(self) -> Set[int]:
+        """Cells that share a unit with another cell holding the same digit."""
+        cells = set()
+        for u, d in self.clashes:
+            cells |= self.holders[u][d]
+        return cells
+
+    def solvable(self) -> bool:
+        """Whether the board as it stands can still be completed."""
+        if self.clashes:
+            return False
+        if self.solution is not None:
+            return self.wrong == 0
+        if self.checked[0] != self.version:
+            self.checked = (self.version, PropagatingSolver(self.cells).solve())
+        return self.checked[1]
+
+    def hint(self) -> Optional[Hint]:
+        """A cell that follows from the board as it stands, or None if no
+        single does (or the board has a conflict)."""
+        if self.clashes:
+            return None
+        cells = self.cells
+        for i in range(81):
+            if not cells[i]:
+                m = self.candidates(i)
+                if POPCOUNT[m] == 1:
+                    return Hint(i, m.bit_length(), "the only digit left for this cell")
+        for u, unit in enumerate(UNITS):
+            once = twice = 0
+            for i in unit:
+                m = self.candidates(i)
+                twice |= once & m
+                once |= m
+            singles = once & ~twice
+            if singles:
+                bit = singles & -singles
+                for i in unit:
+                    if self.candidates(i) & bit:
+                        return Hint(i, bit.bit_length(),
+                                    "the only place left for %d in %s" % (bit.bit_length(), UNIT_NAMES[u]))
+        return None
+
+    @property
+    def solved(self) -> bool:
+        return all(self.cells) and not self.clashes
+
+
+if __name__ == "__main__":
+    # play a puzzle out by hints alone, timing every call on the way
+    session = Session(parse(sys.argv[1]))
+    times = {"hint": [], "set": [], "conflicts": [], "solvable": []}
+
+    def timed(name, f, *args):
+        t0 = time.perf_counter()
+        result = f(*args)
+        times[name].append(time.perf_counter() - t0)
+        return result
+
+    while True:
+        hint = timed("hint", session.hint)
+        if hint is None:
+            break
+        print(hint)
+        timed("set", session.set, hint.cell, hint.digit)
+        timed("conflicts", session.conflicts)
+        timed("solvable", session.solvable)
+    print(to_text(session.cells), "solved" if session.solved else "stuck")
+    for name, ts in times.items():
+        if ts:
+            print("%-10s mean %6.1fus  max %6.1fus" % (name, sum(ts) / len(ts) * 1e6, max(ts) * 1e6))
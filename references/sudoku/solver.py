@@ -1,110 +1,410 @@
+import math
+import sys
+import time
 from typing import List
 
-class Solution:
-    def solveSudoku(self, board: List[List[str]]) -> None:
-        N = len(board)
-        empties = []
+DIGITS = "123456789"
+ALL = (1 << 9) - 1  # bit d-1 stands for digit d
 
-        # ------------------------------------------------------------------
-        # (Kept from your code, but no longer used in the main DFS)
-        # ------------------------------------------------------------------
-        def fullGroup(group: List[str]) -> bool:
-            uniques = list(set(group))
-            if len(uniques) != N:
-                return False
+# row, column and box of every cell index i = r*9 + c
+ROW = [i // 9 for i in range(81)]
+COL = [i % 9 for i in range(81)]
+BOX = [(i // 27) * 3 + (i % 9) // 3 for i in range(81)]
+POPCOUNT = [bin(m).count("1") for m in range(ALL + 1)]
+
+UNITS = ([[r * 9 + c for c in range(9)] for r in range(9)]
+         + [[r * 9 + c for r in range(9)] for c in range(9)]
+         + [[(b // 3) * 27 + (b % 3) * 3 + (k // 3) * 9 + k % 3 for k in range(9)] for b in range(9)])
+PEERS = [sorted({j for u in UNITS if i in u for j in u} - {i}) for i in range(81)]
+
+
+def box_line_segments():
+    """(three cells where a box meets a row or column, the box's other six,
+    the line's other six) for all 54 box/line intersections."""
+    segments = []
+    for box in UNITS[18:]:
+        for line in UNITS[:18]:
+            seg = [i for i in box if i in line]
+            if seg:
+                segments.append((seg, [i for i in box if i not in seg],
+                                 [i for i in line if i not in seg]))
+    return segments
+
+
+SEGMENTS = box_line_segments()
+
+# deductions PropagatingSolver can run besides naked singles
+RULES = ("hidden", "locked")
+
+
+def parse(text: str) -> List[int]:
+    """81 characters, digits or '.'/'0' for an empty cell -> 81 ints."""
+    text = text.strip()
+    if len(text) != 81:
+        raise ValueError("a puzzle is 81 characters, got %d" % len(text))
+    return [0 if ch in ".0" else int(ch) for ch in text]
+
+
+def to_text(cells: List[int]) -> str:
+    return "".join(DIGITS[d - 1] if d else "." for d in cells)
+
+
+def from_board(board: List[List[str]]) -> List[int]:
+    return [0 if ch == '.' else int(ch) for row in board for ch in row]
+
+
+class MaskSolver:
+    """Backtracking over the 81 cells with the digits already used in each
+    row, column and box kept as 9-bit masks, so a cell's candidates are one
+    OR and one AND, and always branching on the empty cell with the fewest
+    candidates (minimum remaining values)."""
+
+    def __init__(self, cells: List[int]):
+        self.cells = list(cells)
+        self.rows = [0] * 9
+        self.cols = [0] * 9
+        self.boxes = [0] * 9
+        self.empties = []
+        self.consistent = True  # False if two givens clash
+        self.nodes = 0
+        for i, d in enumerate(self.cells):
+            if not d:
+                self.empties.append(i)
+            elif self.candidates(i) >> (d - 1) & 1:
+                self.place(i, 1 << (d - 1))
+            else:
+                self.consistent = False
+
+    def candidates(self, i: int) -> int:
+        return ALL & ~(self.rows[ROW[i]] | self.cols[COL[i]] | self.boxes[BOX[i]])
+
+    def place(self, i: int, bit: int) -> None:
+        self.cells[i] = bit.bit_length()
+        self.rows[ROW[i]] |= bit
+        self.cols[COL[i]] |= bit
+        self.boxes[BOX[i]] |= bit
+
+    def unplace(self, i: int, bit: int) -> None:
+        self.cells[i] = 0
+        self.rows[ROW[i]] ^= bit
+        self.cols[COL[i]] ^= bit
+        self.boxes[BOX[i]] ^= bit
+
+    def pick(self, idx: int) -> int:
+        """Swap the empty cell with the fewest candidates into empties[idx]
+        and return its candidate mask (0 if some cell has none)."""
+        empties = self.empties
+        best_k, best_mask, best_n = idx, 0, 10
+        for k in range(idx, len(empties)):
+            mask = self.candidates(empties[k])
+            n = POPCOUNT[mask]
+            if n < best_n:
+                best_k, best_mask, best_n = k, mask, n
+                if n <= 1:
+                    break
+        empties[idx], empties[best_k] = empties[best_k], empties[idx]
+        return best_mask
+
+    def dfs_rec(self, idx: int) -> bool:
+        if idx == len(self.empties):
+            return True  # all empties filled legally
+        self.nodes += 1
+        mask = self.pick(idx)
+        i = self.empties[idx]
+        while mask:
+            bit = mask & -mask  # lowest candidate
+            mask ^= bit
+            self.place(i, bit)
+            if self.dfs_rec(idx + 1):
+                return True
+            self.unplace(i, bit)
+        return False
+
+    def solve(self) -> bool:
+        return self.consistent and self.dfs_rec(0)
+
+
+class PropagatingSolver:
+    """Candidate masks for every cell, reduced to a fixpoint before each
+    branch by naked singles (a cell with one candidate left), hidden singles
+    (a digit with one place left in a unit) and locked candidates (a digit
+    confined to where a box meets a row or column is removed from the rest
+    of the other unit). Every change is pushed on a trail first, so undoing
+    a branch pops back to its mark instead of copying the grid. `rules`
+    picks which of hidden and locked also run; naked singles always do."""
+
+    def __init__(self, cells: List[int], rules=RULES):
+        self.rules = rules
+        self.cells = [0] * 81
+        self.cand = [ALL] * 81
+        self.trail = []
+        self.queue = []   # cells narrowed to a single candidate, not yet placed
+        self.nodes = 0    # branching points
+        self.steps = {"naked": 0, "hidden": 0, "locked": 0}
+        self.consistent = all(self.assign(i, 1 << (d - 1)) for i, d in enumerate(cells) if d)
+
+    def save(self, i: int) -> None:
+        self.trail.append((i, self.cand[i], self.cells[i]))
+
+    def undo(self, mark: int) -> None:
+        trail, cand, cells = self.trail, self.cand, self.cells
+        while len(trail) > mark:
+            i, m, d = trail.pop()
+            cand[i] = m
+            cells[i] = d
+
+    def eliminate(self, i: int, bits: int) -> bool:
+        m = self.cand[i] & ~bits
+        if m == self.cand[i]:
             return True
+        self.save(i)
+        self.cand[i] = m
+        if not m:
+            return False
+        if m & (m - 1) == 0 and not self.cells[i]:
+            self.queue.append(i)
+        return True
 
-        def checkGroup(group: List[str]) -> bool:
-            seen = set()
-            for ch in group:
-                if ch == '.':
+    def assign(self, i: int, bit: int) -> bool:
+        if not self.cand[i] & bit:
+            return False
+        self.save(i)
+        self.cells[i] = bit.bit_length()
+        self.cand[i] = bit
+        for p in PEERS[i]:
+            if self.cand[p] & bit and not self.eliminate(p, bit):
+                return False
+        return True
+
+    def hidden_singles(self):
+        """True if any were placed, False if none, None on a contradiction."""
+        cand, cells = self.cand, self.cells
+        placed = False
+        for unit in UNITS:
+            once = twice = 0
+            for i in unit:
+                m = cand[i]
+                twice |= once & m
+                once |= m
+            if once != ALL:
+                return None  # some digit has nowhere to go
+            singles = once & ~twice
+            while singles:
+                bit = singles & -singles
+                singles ^= bit
+                for i in unit:
+                    if cand[i] & bit:
+                        break
+                else:
+                    return None
+                if not cells[i]:
+                    if not self.assign(i, bit):
+                        return None
+                    self.steps["hidden"] += 1
+                    placed = True
+        return placed
+
+    def locked_candidates(self):
+        """True if any candidates were removed, None on a contradiction."""
+        cand, cells = self.cand, self.cells
+        changed = False
+        for seg, box_rest, line_rest in SEGMENTS:
+            here = 0
+            for i in seg:
+                if not cells[i]:
+                    here |= cand[i]
+            if not here:
+                continue
+            box = line = 0
+            for i in box_rest:
+                box |= cand[i]
+            for i in line_rest:
+                line |= cand[i]
+            # pointing: only here within the box, so not elsewhere on the line
+            # claiming: only here within the line, so not elsewhere in the box
+            for bits, rest in ((here & ~box, line_rest), (here & ~line, box_rest)):
+                if not bits:
                     continue
-                if ch in seen:
-                    return False
-                seen.add(ch)
-            return True
+                for i in rest:
+                    if cand[i] & bits and not cells[i]:
+                        if not self.eliminate(i, bits):
+                            return None
+                        self.steps["locked"] += 1
+                        changed = True
+        return changed
 
-        def isSolved() -> bool:
-            # Full-board validator, not used inside DFS now
-            # check rows:
-            for row in board:
-                if not (checkGroup(row) and fullGroup(row)):
-                    return False
-
-            # check columns:
-            for i in range(N):
-                col = [row[i] for row in board]
-                if not (checkGroup(col) and fullGroup(col)):
-                    return False
-
-            # check grids:
-            for row_offset in range(0, N, 3):
-                for col_offset in range(0, N, 3):
-                    subgrid = []
-                    for r in range(row_offset, row_offset + 3):
-                        for c in range(col_offset, col_offset + 3):
-                            subgrid.append(board[r][c])
-                    if not (checkGroup(subgrid) and fullGroup(subgrid)):
+    def propagate(self) -> bool:
+        """Run every rule until none applies; False on a contradiction."""
+        while True:
+            while self.queue:
+                i = self.queue.pop()
+                if not self.cells[i]:
+                    if not self.assign(i, self.cand[i]):
                         return False
+                    self.steps["naked"] += 1
+            found = self.hidden_singles() if "hidden" in self.rules else False
+            if found is None:
+                return False
+            if found or self.queue:
+                continue
+            found = self.locked_candidates() if "locked" in self.rules else False
+            if found is None:
+                return False
+            if not found and not self.queue:
+                return True
+
+    def pick(self) -> int:
+        """Unsolved cell with the fewest candidates, -1 if all are solved."""
+        best, best_n = -1, 10
+        for i in range(81):
+            if not self.cells[i]:
+                n = POPCOUNT[self.cand[i]]
+                if n < best_n:
+                    best, best_n = i, n
+                    if n == 2:
+                        break
+        return best
+
+    def dfs_rec(self) -> bool:
+        if not self.propagate():
+            self.queue.clear()
+            return False
+        i = self.pick()
+        if i < 0:
             return True
+        self.nodes += 1
+        mask = self.cand[i]
+        while mask:
+            bit = mask & -mask
+            mask ^= bit
+            mark = len(self.trail)
+            if self.assign(i, bit) and self.dfs_rec():
+                return True
+            self.queue.clear()
+            self.undo(mark)
+        return False
 
-        # ------------------------------------------------------------------
-        # NEW: O(1) constraint tracking with minimal changes to structure
-        # ------------------------------------------------------------------
-        rows  = [set() for _ in range(N)]
-        cols  = [set() for _ in range(N)]
-        boxes = [set() for _ in range(N)]  # index = (r//3)*3 + c//3
-
-        def find_empties():
-            for i, row in enumerate(board):
-                for j, val in enumerate(row):
-                    if val == '.':
-                        empties.append((i, j))
-                    else:
-                        rows[i].add(val)
-                        cols[j].add(val)
-                        boxes[(i // 3) * 3 + (j // 3)].add(val)
-
-        # reuse your validMove name/signature, but now use the row/col/box sets
-        def validMove(board_state: List[List[str]], pos: tuple) -> List[str]:
-            r, c = pos
-            b = (r // 3) * 3 + (c // 3)
-            valid_moves = []
-            for d in "123456789":
-                if d not in rows[r] and d not in cols[c] and d not in boxes[b]:
-                    valid_moves.append(d)
-            return valid_moves
+    def solve(self) -> bool:
+        return self.consistent and self.dfs_rec()
+
+    def count_rec(self, limit: int) -> int:
+        if not self.propagate():
+            self.queue.clear()
+            return 0
+        i = self.pick()
+        if i < 0:
+            if self.solution is None:
+                self.solution = list(self.cells)
+            return 1
+        self.nodes += 1
+        found = 0
+        mask = self.cand[i]
+        while mask and found < limit:
+            bit = mask & -mask
+            mask ^= bit
+            mark = len(self.trail)
+            if self.assign(i, bit):
+                found += self.count_rec(limit - found)
+            self.queue.clear()
+            self.undo(mark)
+        return found
+
+    def count(self, limit: int = 2) -> int:
+        """Number of solutions, stopping at `limit`: count(2) == 1 is a
+        uniqueness check. The first one found is kept in self.solution."""
+        self.solution = None
+        return self.count_rec(limit) if self.consistent else 0
 
-        # ------------------------------------------------------------------
-        # DFS using index into `empties` (no pop/append, no full-board checks)
-        # ------------------------------------------------------------------
-        def dfs_rec(idx: int) -> bool:
-            if idx == len(empties):
-                return True  # all empties filled legally
-
-            r, c = empties[idx]
-            if board[r][c] != '.':
-                return dfs_rec(idx + 1)
-
-            b = (r // 3) * 3 + (c // 3)
-            for move in validMove(board, (r, c)):
-                # place
-                board[r][c] = move
-                rows[r].add(move)
-                cols[c].add(move)
-                boxes[b].add(move)
-
-                if dfs_rec(idx + 1):
-                    return True
-
-                # undo
-                board[r][c] = '.'
-                rows[r].remove(move)
-                cols[c].remove(move)
-                boxes[b].remove(move)
 
+# ----------------------------------------------------------------------
+# Full-board validators, not used inside the search. Boxes are sqrt(N)
+# square, so 16x16 and 25x25 boards check too
+# ----------------------------------------------------------------------
+def fullGroup(group: List[str]) -> bool:
+    uniques = list(set(group))
+    if len(uniques) != len(group) or '.' in uniques:
+        return False
+    return True
+
+
+def checkGroup(group: List[str]) -> bool:
+    seen = set()
+    for ch in group:
+        if ch == '.':
+            continue
+        if ch in seen:
+            return False
+        seen.add(ch)
+    return True
+
+
+def isSolved(board: List[List[str]]) -> bool:
+    N = len(board)
+    B = math.isqrt(N)
+
+    # check rows:
+    for row in board:
+        if not (checkGroup(row) and fullGroup(row)):
+            return False
+
+    # check columns:
+    for i in range(N):
+        col = [row[i] for row in board]
+        if not (checkGroup(col) and fullGroup(col)):
             return False
 
-        find_empties()
-        dfs_rec(0)
+    # check grids:
+    for row_offset in range(0, N, B):
+        for col_offset in range(0, N, B):
+            subgrid = []
+            for r in range(row_offset, row_offset + B):
+                for c in range(col_offset, col_offset + B):
+                    subgrid.append(board[r][c])
+            if not (checkGroup(subgrid) and fullGroup(subgrid)):
+                return False
+    return True
+
+
+class Solution:
+    def solveSudoku(self, board: List[List[str]]) -> None:
+        # ------------------------------------------------------------------
+        # Propagation to a fixpoint, then MRV branching, written back in place;
+        # boards that are not 9x9 go to dlx.py, in the board's own symbols
+        # (seconds for 16x16; a sparse 25x25 can take minutes, see dlx.py)
+        # ------------------------------------------------------------------
+        if len(board) != 9:
+            from dlx import SudokuCover, board_symbols, format_grid, parse_grid
+            text = "".join("".join(row) for row in board)
+            symbols = board_symbols(text, len(board))
+            cells = SudokuCover(parse_grid(text, symbols)).solve()
+            if cells:
+                text = format_grid(cells, symbols)
+                for r, row in enumerate(board):
+                    row[:] = text[r * len(board):(r + 1) * len(board)]
+            return
+        solver = PropagatingSolver(from_board(board))
+        if solver.solve():
+            for i, d in enumerate(solver.cells):
+                board[i // 9][i % 9] = DIGITS[d - 1]
+
 
+if __name__ == "__main__":
+    # python solver.py [--plain] [PUZZLE ...], or one 81-character puzzle per
+    # line on stdin; --plain searches without propagation. Boards that are
+    # not 9x9 go to the exact-cover solver in dlx.py
+    from dlx import SudokuCover, format_grid, parse_grid
+    args = sys.argv[1:]
+    plain = "--plain" in args
+    puzzles = [a for a in args if a != "--plain"] or [line for line in sys.stdin if line.strip()]
+    for text in puzzles:
+        t0 = time.perf_counter()
+        if len("".join(text.split())) != 81:
+            cells = SudokuCover(parse_grid(text)).solve()
+            print(format_grid(cells) if cells else "no solution",
+                  "%.2fms" % ((time.perf_counter() - t0) * 1e3))
+            continue
+        solver = (MaskSolver if plain else PropagatingSolver)(parse(text))
+        solved = solver.solve()
+        print(to_text(solver.cells) if solved else "no solution",
+              "%d nodes %.2fms" % (solver.nodes, (time.perf_counter() - t0) * 1e3),
+              "" if plain else solver.steps)
@@ -0,0 +1,35 @@
+"""Solution.solveSudoku on boards that are not 9x9, which go to dlx.py.
+
+    python -m pytest test_solver.py
+"""
+import os
+
+from dlx import HEX_STYLE, SYMBOLS
+from solver import Solution, isSolved
+
+CORPORA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpora")
+
+
+def board_of(text, n=16):
+    return [list(text[r * n:(r + 1) * n]) for r in range(n)]
+
+
+def puzzle16():
+    with open(os.path.join(CORPORA, "16x16.txt")) as f:
+        return f.readline().strip()
+
+
+def check(text):
+    board = board_of(text)
+    Solution().solveSudoku(board)
+    assert isSolved(board)
+    assert all(ch == "." or ch == got for ch, got in zip(text, "".join(map("".join, board))))
+
+
+def test_16x16():
+    check(puzzle16())
+
+
+def test_16x16_written_0_to_f():
+    # the same board in the symbols 0-F: '0' is a symbol, not an empty cell
+    check(puzzle16().translate(str.maketrans(SYMBOLS[:16], HEX_STYLE[:16])))